@@ -5,23 +5,67 @@ Finds substitute products when budget or other constraints
 aren't met with the original selection.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 
+import numpy as np
 from langchain_core.tools import BaseTool
 
 from ..base import BaseAgent, AgentState, ConversationContext
+from ..base.base_agent import _run_coroutine_sync
 from ..config import AgentConfig, AgentType, get_config
 from ..tools import (
     FindSimilarProductsTool,
     AdjustPriceRangeTool,
     SuggestAlternativesTool
 )
+from .batcher import AltRequestBatcher
 from .prompts import ALTERNATIVE_AGENT_SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
 
+# ========================================
+# Constraint Failure Prompts
+# ========================================
+
+def _render_budget_failure(constraint_value: Any, original_results: List[Dict]) -> str:
+    """Render the agent input for results that exceed the user's budget."""
+    over_budget = "\n".join(
+        f"- {p.get('title')}: ${p.get('price')}" for p in original_results[:3]
+    )
+    return f"""The search results exceed the user's budget of ${constraint_value}.
+Found {len(original_results)} products but all are over budget.
+
+Help find alternatives by:
+1. Looking for similar but cheaper products
+2. Suggesting budget-friendly alternatives
+3. Explaining what trade-offs would be needed
+
+Products over budget:
+{over_budget}
+"""
+
+
+def _render_rating_failure(constraint_value: Any, original_results: List[Dict]) -> str:
+    """Render the agent input for results below the minimum rating."""
+    return f"""The search results have lower ratings than desired (minimum: {constraint_value}).
+Help find better-rated alternatives."""
+
+
+def _render_generic_failure(constraint_type: str, constraint_value: Any) -> str:
+    """Render the agent input for any other unmet constraint."""
+    return f"""Constraint '{constraint_type}' with value '{constraint_value}' couldn't be met.
+Help find alternatives that better match the user's needs."""
+
+
+_CONSTRAINT_RENDERERS: Dict[str, Callable[[Any, List[Dict]], str]] = {
+    "budget": _render_budget_failure,
+    "rating": _render_rating_failure,
+}
+
+
 class AlternativeAgent(BaseAgent):
     """
     AlternativeAgent for FinFind.
@@ -43,15 +87,25 @@ class AlternativeAgent(BaseAgent):
         tools: Optional[List[BaseTool]] = None
     ):
         """Initialize the AlternativeAgent."""
+        # Shared by the LLM agent and the direct-call helpers below
+        self._similar_tool = FindSimilarProductsTool()
+        self._price_tool = AdjustPriceRangeTool()
+        self._suggest_tool = SuggestAlternativesTool()
+        
         super().__init__(config, tools)
         self._alt_config = self.config.alternative
+        self._batcher = AltRequestBatcher(
+            self._similar_tool,
+            max_batch_size=self._alt_config.search_batch_size,
+            max_wait_ms=self._alt_config.search_batch_wait_ms
+        )
     
     def _create_default_tools(self) -> List[BaseTool]:
         """Create the default tools for AlternativeAgent."""
         return [
-            FindSimilarProductsTool(),
-            AdjustPriceRangeTool(),
-            SuggestAlternativesTool()
+            self._similar_tool,
+            self._price_tool,
+            self._suggest_tool
         ]
     
     def _get_system_prompt(self) -> str:
@@ -80,23 +134,93 @@ class AlternativeAgent(BaseAgent):
             AgentState with alternatives.
         """
         # Build comprehensive input
-        alt_input = f"Find {num_alternatives} alternatives for this product:\n"
-        alt_input += f"Product: {product.get('title', 'Unknown')}\n"
-        alt_input += f"Price: ${product.get('price', 'N/A')}\n"
-        alt_input += f"Category: {product.get('category', 'N/A')}\n"
-        alt_input += f"\nReason for alternatives: {reason}\n"
+        budget_line = ""
+        if context and context.user and context.user.financial.budget_max:
+            budget_line = f"User's budget: ${context.user.financial.budget_max}\n"
         
-        if context and context.user:
-            if context.user.financial.budget_max:
-                alt_input += f"User's budget: ${context.user.financial.budget_max}\n"
+        alt_input = (
+            f"Find {num_alternatives} alternatives for this product:\n"
+            f"Product: {product.get('title', 'Unknown')}\n"
+            f"Price: ${product.get('price', 'N/A')}\n"
+            f"Category: {product.get('category', 'N/A')}\n"
+            f"\nReason for alternatives: {reason}\n"
+            f"{budget_line}"
+            "\nFind good alternatives and explain trade-offs."
+        )
         
-        alt_input += "\nFind good alternatives and explain trade-offs."
+        # Skip the LLM when no realistic alternative can fit the budget
+        infeasible = await self._quick_feasibility_check(product, context)
+        if infeasible:
+            return self._no_alternatives_state(alt_input, infeasible, state, context)
         
         # Run the agent
         state = await self.run(alt_input, state, context)
         
         return state
     
+    async def _quick_feasibility_check(
+        self,
+        product: Dict,
+        context: Optional[ConversationContext]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Check whether the user's budget is hopelessly below the product price.
+        
+        Args:
+            product: Original product.
+            context: Optional conversation context.
+            
+        Returns:
+            The price analysis if the budget would need a discount deeper
+            than ``max_feasible_discount``, otherwise None.
+        """
+        if not (context and context.user and context.user.financial.budget_max):
+            return None
+        
+        original_price = product.get('price') or 0
+        if original_price <= 0:
+            return None
+        
+        price_analysis = await self._price_tool._arun(
+            original_price=original_price,
+            user_budget=context.user.financial.budget_max,
+            adjustment_step=self._alt_config.price_range_step,
+            max_steps=self._alt_config.max_price_adjustments
+        )
+        if not price_analysis.get('adjustment_needed'):
+            return None
+        
+        # Derived from the overage rather than min_discount_needed, which is
+        # None whenever the required cut lies beyond the stepped ranges
+        discount_needed = price_analysis.get('overage', 0) / original_price
+        if discount_needed > self._alt_config.max_feasible_discount:
+            return price_analysis
+        return None
+    
+    def _no_alternatives_state(
+        self,
+        input_text: str,
+        price_analysis: Dict[str, Any],
+        state: Optional[AgentState],
+        context: Optional[ConversationContext]
+    ) -> AgentState:
+        """Build the result state for a request that cannot fit the budget."""
+        if state is None:
+            state = AgentState(input_text=input_text)
+            if context:
+                state.context = context
+        
+        state.current_agent = self.agent_name
+        state.agent_chain.append(self.agent_name)
+        state.output_text = "No viable alternatives within the given budget"
+        state.add_result(self.agent_name, {"price_analysis": price_analysis})
+        
+        logger.info(
+            "[%s] Skipped search: price is %s%% over budget",
+            self.agent_name, price_analysis.get('overage_percent')
+        )
+        return state
+    
     def find_alternatives_sync(
         self,
         product: Dict,
@@ -106,13 +230,16 @@ class AlternativeAgent(BaseAgent):
         num_alternatives: int = 3
     ) -> AgentState:
         """Synchronous version of find_alternatives()."""
-        alt_input = f"Find {num_alternatives} alternatives for: {product.get('title', 'Unknown')}\n"
-        alt_input += f"Price: ${product.get('price', 'N/A')}\n"
-        alt_input += f"Reason: {reason}"
+        budget_line = ""
+        if context and context.user and context.user.financial.budget_max:
+            budget_line = f"\nUser budget: ${context.user.financial.budget_max}"
         
-        if context and context.user:
-            if context.user.financial.budget_max:
-                alt_input += f"\nUser budget: ${context.user.financial.budget_max}"
+        alt_input = (
+            f"Find {num_alternatives} alternatives for: {product.get('title', 'Unknown')}\n"
+            f"Price: ${product.get('price', 'N/A')}\n"
+            f"Reason: {reason}"
+            f"{budget_line}"
+        )
         
         return self.run_sync(alt_input, state, context)
     
@@ -121,11 +248,24 @@ class AlternativeAgent(BaseAgent):
         product: Dict,
         user_budget: float,
         num_alternatives: int = 3
+    ) -> Dict[str, Any]:
+        """Synchronous version of aget_budget_alternatives()."""
+        return _run_coroutine_sync(
+            self.aget_budget_alternatives(product, user_budget, num_alternatives)
+        )
+    
+    async def aget_budget_alternatives(
+        self,
+        product: Dict,
+        user_budget: float,
+        num_alternatives: int = 3
     ) -> Dict[str, Any]:
         """
         Get alternatives within a budget without full agent execution.
         
-        Directly calls tools for faster results.
+        Directly calls tools for faster results. The price analysis and
+        the similarity searches are independent, so they run concurrently.
+        Successful results are cached per (product, budget, count).
         
         Args:
             product: Original product.
@@ -135,43 +275,69 @@ class AlternativeAgent(BaseAgent):
         Returns:
             Dictionary with alternatives and analysis.
         """
-        # Get tools
-        similar_tool = FindSimilarProductsTool()
-        price_tool = AdjustPriceRangeTool()
-        suggest_tool = SuggestAlternativesTool()
-        
         product_id = product.get('id') or product.get('original_id')
         original_price = product.get('price', 0)
         
+        # Check cache (imported here: services imports the MCP package,
+        # which would be circular at module load)
+        from ..services import get_cache_service
+        cache = get_cache_service()
+        # Money is keyed to the cent, so 100, 100.0 and 99.999999 share entries
+        cache_key = (
+            f"{product_id}:{float(original_price or 0):.2f}:"
+            f"{float(user_budget):.2f}:{num_alternatives}"
+        )
+        cached = cache.get("budget_alternatives", cache_key)
+        if cached is not None:
+            return cached
+        
         # Calculate price adjustment needed
-        price_analysis = price_tool._run(
+        price_task = self._price_tool._arun(
             original_price=original_price,
             user_budget=user_budget,
             adjustment_step=self._alt_config.price_range_step,
             max_steps=self._alt_config.max_price_adjustments
         )
         
-        # Find similar products within budget
-        similar_result = similar_tool._run(
+        # Find similar products within budget. The same-category and broader
+        # searches are issued together so an underfilled first pass does not
+        # cost a second Qdrant round-trip, and are batched with concurrent
+        # requests from other users. Both share one exclude set; overlap
+        # between the two result lists is removed below.
+        exclude = {product_id}
+        similar_task = self._batcher.submit(
             product_id=product_id,
-            max_price=user_budget,
-            same_category=True,
-            limit=num_alternatives,
-            exclude_ids=[product_id]
+            queries=[
+                {
+                    "max_price": user_budget,
+                    "same_category": True,
+                    "limit": num_alternatives,
+                    "exclude_ids": exclude
+                },
+                {
+                    "max_price": user_budget,
+                    "same_category": False,
+                    "limit": num_alternatives * 2,
+                    "exclude_ids": exclude
+                }
+            ]
+        )
+        
+        price_analysis, (same_result, broader_result) = await asyncio.gather(
+            price_task, similar_task
         )
         
-        alternatives = similar_result.get('alternatives', [])
+        alternatives = same_result.get('alternatives', [])
         
-        # If not enough alternatives in same category, try broader search
+        # If not enough alternatives in same category, use the broader search
         if len(alternatives) < num_alternatives:
-            broader_result = similar_tool._run(
-                product_id=product_id,
-                max_price=user_budget,
-                same_category=False,
-                limit=num_alternatives - len(alternatives),
-                exclude_ids=[product_id] + [a['product_id'] for a in alternatives]
-            )
-            alternatives.extend(broader_result.get('alternatives', []))
+            exclude.update(a['product_id'] for a in alternatives)
+            for alt in broader_result.get('alternatives', []):
+                if len(alternatives) >= num_alternatives:
+                    break
+                if alt['product_id'] not in exclude:
+                    exclude.add(alt['product_id'])
+                    alternatives.append(alt)
         
         # Prepare result
         result = {
@@ -196,6 +362,10 @@ class AlternativeAgent(BaseAgent):
         if not alternatives:
             result["message"] = "No alternatives found within budget in the same category. Consider broadening your search or adjusting your budget."
         
+        # Don't cache results from failed searches
+        if same_result.get('success') and broader_result.get('success'):
+            cache.set("budget_alternatives", cache_key, result)
+        
         return result
     
     def suggest_downgrades(
@@ -215,13 +385,11 @@ class AlternativeAgent(BaseAgent):
         Returns:
             Dictionary with downgrade suggestions.
         """
-        similar_tool = FindSimilarProductsTool()
-        
         product_id = product.get('id') or product.get('original_id')
         original_price = product.get('price', 0)
         target_max_price = original_price * (1 - price_reduction_percent / 100)
         
-        result = similar_tool._run(
+        result = self._similar_tool._run(
             product_id=product_id,
             max_price=target_max_price,
             same_category=True,
@@ -231,9 +399,20 @@ class AlternativeAgent(BaseAgent):
         downgrades = result.get('alternatives', [])
         
         # Annotate with savings info
-        for d in downgrades:
-            d['savings'] = round(original_price - d.get('price', 0), 2)
-            d['savings_percent'] = round(d['savings'] / original_price * 100, 1) if original_price > 0 else 0
+        prices = np.fromiter(
+            (d.get('price', 0) for d in downgrades),
+            dtype=np.float64,
+            count=len(downgrades)
+        )
+        savings = np.round(original_price - prices, 2)
+        if original_price > 0:
+            savings_percent = np.round(savings / original_price * 100, 1)
+        else:
+            savings_percent = np.zeros_like(savings)
+        
+        for d, saved, percent in zip(downgrades, savings.tolist(), savings_percent.tolist()):
+            d['savings'] = saved
+            d['savings_percent'] = percent
         
         return {
             "success": True,
@@ -266,9 +445,7 @@ class AlternativeAgent(BaseAgent):
         Returns:
             Dictionary with alternatives and explanations.
         """
-        suggest_tool = SuggestAlternativesTool()
-        
-        result = suggest_tool._run(
+        result = self._suggest_tool._run(
             original_product=product,
             user_profile=user_profile,
             reason=reason,
@@ -299,27 +476,11 @@ class AlternativeAgent(BaseAgent):
             AgentState with alternative solutions.
         """
         # Build input based on constraint type
-        if constraint_type == "budget":
-            alt_input = f"""The search results exceed the user's budget of ${constraint_value}.
-Found {len(original_results)} products but all are over budget.
-
-Help find alternatives by:
-1. Looking for similar but cheaper products
-2. Suggesting budget-friendly alternatives
-3. Explaining what trade-offs would be needed
-
-Products over budget:
-"""
-            for p in original_results[:3]:
-                alt_input += f"- {p.get('title')}: ${p.get('price')}\n"
-        
-        elif constraint_type == "rating":
-            alt_input = f"""The search results have lower ratings than desired (minimum: {constraint_value}).
-Help find better-rated alternatives."""
-        
+        renderer = _CONSTRAINT_RENDERERS.get(constraint_type)
+        if renderer:
+            alt_input = renderer(constraint_value, original_results)
         else:
-            alt_input = f"""Constraint '{constraint_type}' with value '{constraint_value}' couldn't be met.
-Help find alternatives that better match the user's needs."""
+            alt_input = _render_generic_failure(constraint_type, constraint_value)
         
         # Run the agent
         state = await self.run(alt_input, state, context)
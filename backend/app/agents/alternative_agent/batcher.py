@@ -0,0 +1,59 @@
+"""
+Request batching for AlternativeAgent similarity searches.
+
+Collects concurrent similar-product lookups for a few milliseconds
+and sends them to Qdrant together, so simultaneous requests share
+one source-product scroll and one batched vector query.
+"""
+
+from typing import Dict, Any, List
+
+from ..services.batching import MicroBatcher
+from ..tools import FindSimilarProductsTool
+
+
+class AltRequestBatcher(MicroBatcher):
+    """
+    Micro-batcher in front of FindSimilarProductsTool.run_multi().
+
+    Batches are kept per event loop (see MicroBatcher), so concurrent
+    sync callers each running their own ``asyncio.run`` never share one.
+    """
+
+    def __init__(
+        self,
+        tool: FindSimilarProductsTool,
+        max_batch_size: int = 16,
+        max_wait_ms: int = 5
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            tool: Tool used to execute the batched searches.
+            max_batch_size: Flush as soon as this many requests are pending.
+            max_wait_ms: Maximum time a request waits for others to join.
+        """
+        super().__init__(
+            tool.run_multi,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name="Alternative"
+        )
+
+    async def submit(
+        self,
+        product_id: str,
+        queries: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Queue a similarity lookup and wait for its batch to complete.
+
+        Args:
+            product_id: Source product ID.
+            queries: Constraint sets, as accepted by run_batch().
+
+        Returns:
+            One result dict per query, in the same order.
+        """
+        return await super().submit((product_id, queries))
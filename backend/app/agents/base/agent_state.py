@@ -5,24 +5,57 @@ Defines state structures for tracking agent context,
 user information, and conversation history.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional
+from itertools import islice
+from typing import Collection, Deque, Dict, Iterator, List, Any, Optional
 from datetime import datetime
-from enum import Enum
+from enum import IntEnum
+import time
 import uuid
 
 
-class ConversationStage(str, Enum):
-    """Stages of a shopping conversation."""
-    INITIAL = "initial"
-    SEARCH = "search"
-    BROWSE = "browse"
-    COMPARE = "compare"
-    DECIDE = "decide"
-    PURCHASE = "purchase"
+# History bounds; older entries are evicted on append
+MAX_MESSAGES = 200
+MAX_RECENT_SEARCHES = 20
+MAX_VIEWED_PRODUCTS = 50
 
 
-@dataclass
+def _tail(items: Collection, n: int) -> List:
+    """Return the last n items of a deque or ordered set as a list."""
+    return list(islice(items, max(0, len(items) - n), None))
+
+
+class ConversationStage(IntEnum):
+    """Stages of a shopping conversation, in funnel order."""
+    INITIAL = 0
+    SEARCH = 1
+    BROWSE = 2
+    COMPARE = 3
+    DECIDE = 4
+    PURCHASE = 5
+    
+    @property
+    def label(self) -> str:
+        """Wire name of the stage (e.g. "search")."""
+        return _STAGE_NAMES[self]
+    
+    @classmethod
+    def from_name(cls, name: str) -> "ConversationStage":
+        """Parse a stage from its wire name."""
+        try:
+            return cls(_STAGE_NAMES.index(name))
+        except ValueError:
+            raise ValueError(f"Unknown conversation stage: {name!r}") from None
+
+
+# Wire names indexed by ConversationStage value
+_STAGE_NAMES: tuple[str, ...] = (
+    "initial", "search", "browse", "compare", "decide", "purchase"
+)
+
+
+@dataclass(slots=True)
 class FinancialContext:
     """User's financial context for filtering and recommendations."""
     
@@ -36,11 +69,7 @@ class FinancialContext:
     
     def get_effective_budget(self) -> Optional[float]:
         """Get the effective maximum budget."""
-        if self.budget_max:
-            return self.budget_max
-        if self.monthly_budget:
-            return self.monthly_budget
-        return self.disposable_income
+        return self.budget_max or self.monthly_budget or self.disposable_income
     
     def can_afford(self, price: float, tolerance: float = 0.0) -> bool:
         """Check if a price is within budget."""
@@ -59,7 +88,7 @@ class FinancialContext:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class UserContext:
     """Context about the current user."""
     
@@ -73,8 +102,12 @@ class UserContext:
     disliked_brands: List[str] = field(default_factory=list)
     
     # History
-    recent_searches: List[str] = field(default_factory=list)
-    viewed_products: List[str] = field(default_factory=list)
+    recent_searches: Deque[str] = field(
+        default_factory=lambda: deque(maxlen=MAX_RECENT_SEARCHES)
+    )
+    viewed_products: Deque[str] = field(
+        default_factory=lambda: deque(maxlen=MAX_VIEWED_PRODUCTS)
+    )
     purchased_products: List[str] = field(default_factory=list)
     
     # Session info
@@ -88,12 +121,12 @@ class UserContext:
             "financial": self.financial.to_dict(),
             "preferred_categories": self.preferred_categories,
             "preferred_brands": self.preferred_brands,
-            "recent_searches": self.recent_searches[-5:],  # Last 5
-            "viewed_products": self.viewed_products[-10:],  # Last 10
+            "recent_searches": _tail(self.recent_searches, 5),  # Last 5
+            "viewed_products": _tail(self.viewed_products, 10),  # Last 10
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchContext:
     """Context from a search operation."""
     
@@ -106,18 +139,19 @@ class SearchContext:
     timestamp: datetime = field(default_factory=datetime.utcnow)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductContext:
     """Context about products being discussed."""
     
-    product_ids: List[str] = field(default_factory=list)
+    # Insertion-ordered dicts used as ordered sets (O(1) dedup)
+    product_ids: Dict[str, None] = field(default_factory=dict)
     product_details: Dict[str, Dict] = field(default_factory=dict)
-    compared_products: List[str] = field(default_factory=list)
-    recommended_products: List[str] = field(default_factory=list)
-    rejected_products: List[str] = field(default_factory=list)
+    compared_products: Dict[str, None] = field(default_factory=dict)
+    recommended_products: Dict[str, None] = field(default_factory=dict)
+    rejected_products: Dict[str, None] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationContext:
     """Full conversation context."""
     
@@ -125,7 +159,9 @@ class ConversationContext:
     stage: ConversationStage = ConversationStage.INITIAL
     
     # Message history
-    messages: List[Dict[str, Any]] = field(default_factory=list)
+    messages: Deque[Dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=MAX_MESSAGES)
+    )
     
     # Contexts
     user: UserContext = field(default_factory=UserContext)
@@ -142,36 +178,42 @@ class ConversationContext:
     
     def add_message(self, role: str, content: str, agent: Optional[str] = None):
         """Add a message to the conversation."""
+        now = datetime.utcnow()
         self.messages.append({
             "role": role,
             "content": content,
             "agent": agent,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": now.isoformat()
         })
-        self.updated_at = datetime.utcnow()
+        self.updated_at = now
     
-    def get_recent_messages(self, n: int = 10) -> List[Dict]:
-        """Get the n most recent messages."""
-        return self.messages[-n:]
+    def get_recent_messages(self, n: int = 10) -> Iterator[Dict]:
+        """
+        Iterate over the n most recent messages, oldest first.
+        
+        The iterator reads the history lazily, so consume it before
+        adding further messages.
+        """
+        return islice(self.messages, max(0, len(self.messages) - n), None)
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "conversation_id": self.conversation_id,
-            "stage": self.stage.value,
+            "stage": _STAGE_NAMES[self.stage],
             "user": self.user.to_dict(),
             "search": {
                 "query": self.search.query,
                 "intent": self.search.detected_intent
             } if self.search else None,
             "products": {
-                "viewed": self.products.product_ids[-5:],
-                "recommended": self.products.recommended_products[-5:]
+                "viewed": _tail(self.products.product_ids, 5),
+                "recommended": _tail(self.products.recommended_products, 5)
             },
             "message_count": len(self.messages)
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentState:
     """
     Complete state for an agent execution.
@@ -205,16 +247,30 @@ class AgentState:
     errors: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
     
-    # Metadata
+    # Metadata (wall-clock for display, monotonic for timing)
     start_time: datetime = field(default_factory=datetime.utcnow)
     end_time: Optional[datetime] = None
-    
-    def add_result(self, agent: str, result: Dict[str, Any]):
-        """Add intermediate result from an agent."""
+    _start_ns: int = field(default_factory=time.monotonic_ns, init=False, repr=False)
+    _end_ns: Optional[int] = field(default=None, init=False, repr=False)
+    
+    def add_result(
+        self,
+        agent: str,
+        result: Dict[str, Any],
+        ts: Optional[datetime] = None
+    ):
+        """
+        Add intermediate result from an agent.
+        
+        Args:
+            agent: Name of the agent producing the result.
+            result: Result payload.
+            ts: Optional timestamp, so a batch of results can share one.
+        """
         self.intermediate_results.append({
             "agent": agent,
             "result": result,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": (ts or datetime.utcnow()).isoformat()
         })
     
     def add_error(self, error: str):
@@ -228,13 +284,13 @@ class AgentState:
     def mark_complete(self):
         """Mark the state as complete."""
         self.end_time = datetime.utcnow()
+        self._end_ns = time.monotonic_ns()
     
     @property
     def execution_time_ms(self) -> Optional[float]:
         """Get execution time in milliseconds."""
-        if self.end_time:
-            delta = self.end_time - self.start_time
-            return delta.total_seconds() * 1000
+        if self._end_ns is not None:
+            return (self._end_ns - self._start_ns) / 1_000_000
         return None
     
     def to_dict(self) -> Dict[str, Any]:
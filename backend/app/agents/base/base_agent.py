@@ -5,9 +5,17 @@ Provides the foundation for all specialized agents with common
 functionality for LLM interaction, tool execution, and state management.
 """
 
+import asyncio
+import atexit
+import copy
+import hashlib
+import json
 import logging
+import reprlib
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Callable, Type
+from itertools import islice
+from typing import Dict, Any, List, Optional, Callable, Coroutine, Tuple, Type
 from datetime import datetime
 
 from langchain_core.language_models import BaseChatModel
@@ -18,10 +26,92 @@ from langchain_classic.agents import AgentExecutor, create_tool_calling_agent
 from langchain_groq import ChatGroq
 
 from .agent_state import AgentState, ConversationContext
+from .parallel_executor import ParallelAgentExecutor
 from ..config import AgentConfig, get_config, AgentType
 
 logger = logging.getLogger(__name__)
 
+# Bounded reprs for debug tool steps, so large observations are never
+# stringified in full just to be truncated
+_TOOL_INPUT_REPR = reprlib.Repr()
+_TOOL_INPUT_REPR.maxstring = _TOOL_INPUT_REPR.maxother = 200
+_TOOL_OUTPUT_REPR = reprlib.Repr()
+_TOOL_OUTPUT_REPR.maxstring = _TOOL_OUTPUT_REPR.maxother = 500
+
+# Upper bound on chat history turns sent with each request
+MAX_HISTORY_MESSAGES = 10
+
+# Share of the context window kept free because _estimate_tokens() is a
+# guess: code, numbers and short words tokenize denser than 4 bytes/token,
+# and tool schemas sent with the prompt are not counted at all
+HISTORY_TOKEN_MARGIN = 0.15
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 UTF-8 bytes per token plus per-message overhead).
+    
+    This is a heuristic, not the model tokenizer: Groq serves Llama models
+    whose vocabulary is not available locally. Counting bytes rather than
+    characters keeps non-ASCII text from being badly undercounted; the
+    remaining error is covered by HISTORY_TOKEN_MARGIN.
+    """
+    return len(text.encode("utf-8")) // 4 + 4
+
+
+# Process-wide LLM clients keyed by their constructor settings
+_LLM_POOL: Dict[tuple, BaseChatModel] = {}
+
+# Event loop that backs the synchronous run_sync() entry points
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_thread: Optional[threading.Thread] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _run_coroutine_sync(coro: Coroutine) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    Uses one long-lived background event loop rather than asyncio.run(),
+    so pooled async LLM clients are never bound to a closed loop. Calls
+    from another thread's running loop block that thread until the
+    coroutine finishes, but do not raise.
+    
+    Raises:
+        RuntimeError: If called from the background loop's own thread
+            (e.g. a sync wrapper used inside an agent coroutine), which
+            would otherwise deadlock; await the async variant instead.
+    """
+    global _sync_loop, _sync_thread
+    if _sync_loop is None:
+        with _sync_loop_lock:
+            if _sync_loop is None:
+                loop = asyncio.new_event_loop()
+                _sync_thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="agent-sync-loop",
+                    daemon=True
+                )
+                _sync_thread.start()
+                atexit.register(_stop_sync_loop)
+                _sync_loop = loop
+    
+    if threading.current_thread() is _sync_thread:
+        coro.close()
+        raise RuntimeError(
+            "Synchronous agent call made from the agent-sync-loop thread; "
+            "await the async variant instead"
+        )
+    return asyncio.run_coroutine_threadsafe(coro, _sync_loop).result()
+
+
+def _stop_sync_loop():
+    """Stop the background loop at interpreter exit."""
+    if _sync_loop is not None and _sync_loop.is_running():
+        _sync_loop.call_soon_threadsafe(_sync_loop.stop)
+        if _sync_thread is not None:
+            _sync_thread.join(timeout=1)
+
 
 class BaseAgent(ABC):
     """
@@ -40,6 +130,9 @@ class BaseAgent(ABC):
     agent_name: str
     agent_description: str
     
+    # Compiled prompt templates keyed by (class, system prompt, cache markers)
+    _PROMPT_CACHE: Dict[tuple, ChatPromptTemplate] = {}
+    
     def __init__(
         self,
         config: Optional[AgentConfig] = None,
@@ -70,16 +163,34 @@ class BaseAgent(ABC):
     # ========================================
     
     def _create_llm(self, use_fallback: bool = False) -> BaseChatModel:
-        """Create the LLM instance (Groq)."""
-        model = self.config.llm.fallback_model if use_fallback else self.config.llm.model
-        return ChatGroq(
-            model=model,
-            api_key=self.config.llm.api_key,
-            temperature=self.config.llm.temperature,
-            max_tokens=self.config.llm.max_tokens,
-            timeout=self.config.llm.timeout,
-            max_retries=self.config.llm.max_retries,
+        """
+        Get the LLM instance (Groq) for this agent's settings.
+        
+        Instances are pooled per process, so agents with the same model
+        settings share one client and its HTTP connection pool.
+        """
+        llm_config = self.config.llm
+        model = llm_config.fallback_model if use_fallback else llm_config.model
+        key = (
+            model,
+            llm_config.api_key,
+            llm_config.temperature,
+            llm_config.max_tokens,
+            llm_config.timeout,
+            llm_config.max_retries,
         )
+        
+        llm = _LLM_POOL.get(key)
+        if llm is None:
+            llm = _LLM_POOL.setdefault(key, ChatGroq(
+                model=model,
+                api_key=llm_config.api_key,
+                temperature=llm_config.temperature,
+                max_tokens=llm_config.max_tokens,
+                timeout=llm_config.timeout,
+                max_retries=llm_config.max_retries,
+            ))
+        return llm
     
     @property
     def fallback_llm(self) -> BaseChatModel:
@@ -142,17 +253,49 @@ class BaseAgent(ABC):
         pass
     
     def _create_prompt_template(self) -> ChatPromptTemplate:
-        """Create the prompt template for the agent."""
+        """
+        Create the prompt template for the agent.
+        
+        The static system prompt comes first and is passed as a literal
+        message, so the request prefix is byte-identical across turns and
+        can be served from the provider's prompt cache. Everything dynamic
+        (history, input, scratchpad) follows it.
+        """
+        system_prompt = self._get_system_prompt()
+        if self.config.llm.prompt_cache_control:
+            system_message = SystemMessage(content=[{
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }])
+        else:
+            system_message = SystemMessage(content=system_prompt)
+        
         return ChatPromptTemplate.from_messages([
-            ("system", self._get_system_prompt()),
+            system_message,
             MessagesPlaceholder(variable_name="chat_history", optional=True),
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
     
+    @property
+    def prompt_template(self) -> ChatPromptTemplate:
+        """
+        Get the prompt template shared by both executors.
+        
+        Templates are built once per agent class and system prompt and
+        reused by every instance, including after add_tool() resets the
+        executors.
+        """
+        key = (type(self), self._get_system_prompt(), self.config.llm.prompt_cache_control)
+        template = self._PROMPT_CACHE.get(key)
+        if template is None:
+            template = self._PROMPT_CACHE.setdefault(key, self._create_prompt_template())
+        return template
+    
     def _create_agent_executor(self) -> AgentExecutor:
         """Create the LangChain agent executor."""
-        prompt = self._create_prompt_template()
+        prompt = self.prompt_template
         
         # Create the tool-calling agent
         agent = create_tool_calling_agent(
@@ -161,14 +304,16 @@ class BaseAgent(ABC):
             prompt=prompt
         )
         
-        # Create executor with error handling
-        return AgentExecutor(
+        # Create executor with error handling; tool calls from one LLM
+        # step run concurrently
+        return ParallelAgentExecutor(
             agent=agent,
             tools=self._tools,
             verbose=self.config.debug,
             handle_parsing_errors=True,
             max_iterations=10,
-            return_intermediate_steps=True
+            return_intermediate_steps=self.config.debug,
+            tool_concurrency_limit=self.config.tool_concurrency_limit
         )
     
     @property
@@ -180,7 +325,7 @@ class BaseAgent(ABC):
     
     def _create_fallback_executor(self) -> AgentExecutor:
         """Create agent executor with fallback (smaller) LLM."""
-        prompt = self._create_prompt_template()
+        prompt = self.prompt_template
         
         agent = create_tool_calling_agent(
             llm=self.fallback_llm,
@@ -188,13 +333,14 @@ class BaseAgent(ABC):
             prompt=prompt
         )
         
-        return AgentExecutor(
+        return ParallelAgentExecutor(
             agent=agent,
             tools=self._tools,
             verbose=self.config.debug,
             handle_parsing_errors=True,
             max_iterations=10,
-            return_intermediate_steps=True
+            return_intermediate_steps=self.config.debug,
+            tool_concurrency_limit=self.config.tool_concurrency_limit
         )
     
     @property
@@ -239,39 +385,84 @@ class BaseAgent(ABC):
         state.current_agent = self.agent_name
         state.agent_chain.append(self.agent_name)
         
-        logger.info(f"[{self.agent_name}] Running with input: {input_text[:100]}...")
+        logger.info("[%s] Running with input: %.100s...", self.agent_name, input_text)
         
         try:
             # Prepare input for executor
             executor_input = self._prepare_executor_input(input_text, state)
             
-            # Run the agent
-            result = await self.executor.ainvoke(executor_input)
+            # Run the agent, unless an identical request was answered recently
+            cache_key = self._response_cache_key(executor_input, state)
+            result = self._get_cached_response(cache_key)
+            if result is not None:
+                state.add_result(self.agent_name, {"cache_hit": True})
+            else:
+                # Warm tool resources while the LLM is decoding; the
+                # answer never waits for it
+                prefetch = asyncio.create_task(self._speculative_prefetch(state))
+                try:
+                    result = await self.executor.ainvoke(executor_input)
+                finally:
+                    prefetch.cancel()
+                self._cache_response(cache_key, result)
             
             # Process result
             state = self._process_result(result, state)
             
-            logger.info(f"[{self.agent_name}] Completed successfully")
+            logger.info("[%s] Completed successfully", self.agent_name)
             
         except Exception as e:
             # Check if we should try fallback model
             if self._is_rate_limit_error(e) and self.config.llm.use_fallback_on_rate_limit:
-                logger.warning(f"[{self.agent_name}] Rate limit hit, trying fallback model ({self.config.llm.fallback_model})...")
+                logger.warning(
+                    "[%s] Rate limit hit, trying fallback model (%s)...",
+                    self.agent_name, self.config.llm.fallback_model
+                )
                 try:
                     executor_input = self._prepare_executor_input(input_text, state)
                     result = await self.fallback_executor.ainvoke(executor_input)
                     state = self._process_result(result, state)
                     self._using_fallback = True
-                    logger.info(f"[{self.agent_name}] Completed successfully with fallback model")
+                    logger.info("[%s] Completed successfully with fallback model", self.agent_name)
                 except Exception as fallback_error:
-                    logger.exception(f"[{self.agent_name}] Fallback also failed: {fallback_error}")
+                    logger.exception("[%s] Fallback also failed: %s", self.agent_name, fallback_error)
                     state.add_error(f"{self.agent_name}: {str(e)} (fallback also failed: {str(fallback_error)})")
             else:
-                logger.exception(f"[{self.agent_name}] Error: {e}")
+                logger.exception("[%s] Error: %s", self.agent_name, e)
                 state.add_error(f"{self.agent_name}: {str(e)}")
         
         return state
     
+    async def _speculative_prefetch(self, state: AgentState):
+        """
+        Warm resources the tools are likely to need, concurrently with
+        the first LLM call.
+        
+        The default loads the embedding model and Qdrant client and
+        embeds the input text, which QdrantSearchTool often receives
+        verbatim as its query; agents without that tool skip it, since
+        the embedding thread keeps running even after cancellation.
+        Subclasses can override this to prefetch agent-specific data.
+        Failures are logged and ignored, and the prefetch is cancelled
+        once the LLM call returns.
+        """
+        if not self.config.speculative_prefetch:
+            return
+        
+        from ..tools.qdrant_tools import QdrantSearchTool, embed_text, get_qdrant_client
+        
+        if not any(isinstance(tool, QdrantSearchTool) for tool in self._tools):
+            return
+        
+        def warm():
+            get_qdrant_client()
+            embed_text(state.input_text[:500])
+        
+        try:
+            await asyncio.to_thread(warm)
+        except Exception as e:
+            logger.debug("[%s] Speculative prefetch skipped: %s", self.agent_name, e)
+    
     def run_sync(
         self,
         input_text: str,
@@ -279,68 +470,109 @@ class BaseAgent(ABC):
         context: Optional[ConversationContext] = None
     ) -> AgentState:
         """Synchronous version of run()."""
-        # Create or update state
-        if state is None:
-            state = AgentState(input_text=input_text)
-            if context:
-                state.context = context
-        
-        state.current_agent = self.agent_name
-        state.agent_chain.append(self.agent_name)
-        
-        logger.info(f"[{self.agent_name}] Running with input: {input_text[:100]}...")
-        
-        try:
-            # Prepare input for executor
-            executor_input = self._prepare_executor_input(input_text, state)
-            
-            # Run the agent
-            result = self.executor.invoke(executor_input)
-            
-            # Process result
-            state = self._process_result(result, state)
-            
-            logger.info(f"[{self.agent_name}] Completed successfully")
-            
-        except Exception as e:
-            # Check if we should try fallback model
-            if self._is_rate_limit_error(e) and self.config.llm.use_fallback_on_rate_limit:
-                logger.warning(f"[{self.agent_name}] Rate limit hit, trying fallback model ({self.config.llm.fallback_model})...")
-                try:
-                    executor_input = self._prepare_executor_input(input_text, state)
-                    result = self.fallback_executor.invoke(executor_input)
-                    state = self._process_result(result, state)
-                    self._using_fallback = True
-                    logger.info(f"[{self.agent_name}] Completed successfully with fallback model")
-                except Exception as fallback_error:
-                    logger.exception(f"[{self.agent_name}] Fallback also failed: {fallback_error}")
-                    state.add_error(f"{self.agent_name}: {str(e)} (fallback also failed: {str(fallback_error)})")
-            else:
-                logger.exception(f"[{self.agent_name}] Error: {e}")
-                state.add_error(f"{self.agent_name}: {str(e)}")
-        
-        return state
+        return _run_coroutine_sync(self.run(input_text, state, context))
     
     def _prepare_executor_input(
         self,
         input_text: str,
         state: AgentState
     ) -> Dict[str, Any]:
-        """Prepare input dictionary for the executor."""
+        """
+        Prepare input dictionary for the executor.
+        
+        Chat history is filled newest-first until the prompt would no
+        longer leave room for max_tokens of output in the context window,
+        less a HISTORY_TOKEN_MARGIN safety share for estimation error.
+        """
         # Build chat history from context
         chat_history = []
         if state.context and state.context.messages:
-            for msg in state.context.get_recent_messages(10):
+            llm_config = self.config.llm
+            budget = (
+                int(llm_config.context_window * (1 - HISTORY_TOKEN_MARGIN))
+                - llm_config.max_tokens
+                - _estimate_tokens(self._get_system_prompt())
+                - _estimate_tokens(input_text)
+            )
+            for msg in islice(reversed(state.context.messages), MAX_HISTORY_MESSAGES):
+                budget -= _estimate_tokens(msg["content"])
+                if budget < 0:
+                    break
                 if msg["role"] == "user":
                     chat_history.append(HumanMessage(content=msg["content"]))
                 else:
                     chat_history.append(AIMessage(content=msg["content"]))
+            chat_history.reverse()
         
         return {
             "input": input_text,
             "chat_history": chat_history
         }
     
+    # ========================================
+    # Response Cache
+    # ========================================
+    
+    def _response_cache_key(
+        self,
+        executor_input: Dict[str, Any],
+        state: AgentState
+    ) -> Optional[str]:
+        """
+        Build the response cache key for an executor input.
+        
+        The key covers everything that shapes the LLM output: system
+        prompt, tools, model, temperature, chat history and input, plus
+        the user context the tools read from, so answers are never
+        shared between users.
+        
+        Returns:
+            Hex digest, or None if responses should not be cached.
+        """
+        llm_config = self.config.llm
+        if not llm_config.cache_responses or llm_config.temperature != 0:
+            return None
+        
+        payload = json.dumps({
+            "agent": self.agent_name,
+            "sys": self._get_system_prompt(),
+            "tools": self.get_tool_names(),
+            "model": llm_config.model,
+            "temp": llm_config.temperature,
+            "history": [
+                (m.type, m.content) for m in executor_input.get("chat_history", [])
+            ],
+            "input": executor_input["input"],
+            "user": state.context.user.to_dict() if state.context else None
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _get_cached_response(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get a cached executor result, if any."""
+        if cache_key is None:
+            return None
+        
+        # Imported here: services imports the MCP package, which would be
+        # circular at module load
+        from ..services import get_cache_service
+        result = get_cache_service().get("agent_responses", cache_key)
+        if result is not None:
+            logger.info("[%s] Response cache hit", self.agent_name)
+        return result
+    
+    def _cache_response(self, cache_key: Optional[str], result: Dict[str, Any]):
+        """Store the answer text of an executor result in the response cache."""
+        if cache_key is None:
+            return
+        
+        from ..services import get_cache_service
+        get_cache_service().set(
+            "agent_responses",
+            cache_key,
+            {"output": result.get("output", "")},
+            ttl=self.config.llm.response_cache_ttl
+        )
+    
     def _process_result(
         self,
         result: Dict[str, Any],
@@ -351,14 +583,16 @@ class BaseAgent(ABC):
         output = result.get("output", "")
         state.output_text = output
         
-        # Store intermediate steps
-        intermediate_steps = result.get("intermediate_steps", [])
-        for action, observation in intermediate_steps:
-            state.add_result(self.agent_name, {
-                "tool": action.tool,
-                "input": str(action.tool_input)[:200],
-                "output": str(observation)[:500]
-            })
+        # Store intermediate steps (only returned in debug mode)
+        intermediate_steps = result.get("intermediate_steps")
+        if intermediate_steps:
+            now = datetime.utcnow()
+            for action, observation in intermediate_steps:
+                state.add_result(self.agent_name, {
+                    "tool": action.tool,
+                    "input": _TOOL_INPUT_REPR.repr(action.tool_input),
+                    "output": _TOOL_OUTPUT_REPR.repr(observation)
+                }, ts=now)
         
         # Add message to context
         if state.context:
@@ -400,7 +634,7 @@ class BaseAgent(ABC):
             state.add_warning(f"Max delegation depth reached, cannot delegate to {agent_name}")
             return state
         
-        logger.info(f"[{self.agent_name}] Delegating to {agent_name}: {task[:50]}...")
+        logger.info("[%s] Delegating to %s: %.50s...", self.agent_name, agent_name, task)
         
         # Increment delegation depth
         state.delegation_depth += 1
@@ -411,6 +645,100 @@ class BaseAgent(ABC):
         
         return state
     
+    async def delegate_to_many(
+        self,
+        targets: List[Tuple[str, str]],
+        state: AgentState
+    ) -> AgentState:
+        """
+        Delegate independent tasks to several agents concurrently.
+        
+        Each agent runs on its own branch of the state (sharing the
+        conversation context), and the branches are merged back into
+        ``state`` in the order of ``targets``.
+        
+        Args:
+            targets: List of ``(agent_name, task)`` pairs.
+            state: Current agent state.
+            
+        Returns:
+            The merged state.
+        """
+        if state.delegation_depth >= self.config.a2a.max_delegation_depth:
+            state.add_warning(
+                f"Max delegation depth reached, cannot delegate to "
+                f"{', '.join(name for name, _ in targets)}"
+            )
+            return state
+        
+        runs = []
+        for agent_name, task in targets:
+            if agent_name not in self._other_agents:
+                state.add_error(f"Agent '{agent_name}' not registered")
+                continue
+            
+            logger.info("[%s] Delegating to %s: %.50s...", self.agent_name, agent_name, task)
+            branch = self._branch_state(state)
+            branch.delegation_depth += 1
+            runs.append(self._other_agents[agent_name].run(task, branch))
+        
+        if not runs:
+            return state
+        
+        branches = await asyncio.gather(*runs)
+        self._merge_results(state, branches)
+        state.delegation_depth = max(branch.delegation_depth for branch in branches)
+        
+        return state
+    
+    def _branch_state(self, state: AgentState) -> AgentState:
+        """
+        Fork a state for a parallel delegation branch.
+        
+        The branch shares the conversation context and scalar fields but
+        starts with empty result lists, which agents only append to, so
+        forking costs the same however much the parent has accumulated.
+        """
+        branch = copy.copy(state)
+        branch.agent_chain = []
+        branch.results = {}
+        branch.intermediate_results = []
+        branch.output_products = []
+        branch.output_explanations = []
+        branch.errors = []
+        branch.warnings = []
+        return branch
+    
+    def _merge_results(self, state: AgentState, branches: List[AgentState]):
+        """
+        Merge parallel delegation branches back into the parent state.
+        
+        Branches only hold what they added on top of the parent.
+        Subclasses can override this to combine domain results.
+        
+        Args:
+            state: Parent state, updated in place.
+            branches: Branch states returned by the delegated agents.
+        """
+        outputs = []
+        for branch in branches:
+            state.agent_chain.extend(branch.agent_chain)
+            state.intermediate_results.extend(branch.intermediate_results)
+            state.results.update(branch.results)
+            state.output_products.extend(branch.output_products)
+            state.output_explanations.extend(branch.output_explanations)
+            for error in branch.errors:
+                if error not in state.errors:
+                    state.add_error(error)
+            for warning in branch.warnings:
+                if warning not in state.warnings:
+                    state.add_warning(warning)
+            if branch.output_text and branch.output_text != state.output_text:
+                outputs.append(branch.output_text)
+        
+        if outputs:
+            state.output_text = "\n\n".join(outputs)
+    
     # ========================================
     # Utility Methods
     # ========================================
@@ -5,11 +5,15 @@ Manages context sharing between agents, context compression,
 and context persistence for multi-turn conversations.
 """
 
-import json
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
-from dataclasses import asdict
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime
+from dataclasses import asdict, fields
+
+import orjson
 
 from .agent_state import (
     AgentState, 
@@ -22,6 +26,9 @@ from .agent_state import (
 
 logger = logging.getLogger(__name__)
 
+# Fields update_context() may set; methods and unknown keys are ignored
+_UPDATABLE_FIELDS = frozenset(f.name for f in fields(ConversationContext))
+
 
 class ContextManager:
     """
@@ -41,9 +48,13 @@ class ContextManager:
         Args:
             max_history: Maximum number of conversations to keep in memory.
         """
-        self._contexts: Dict[str, ConversationContext] = {}
+        # Kept in least-recently-used order; access times drive expiry only
+        self._contexts: OrderedDict[str, ConversationContext] = OrderedDict()
         self._max_history = max_history
-        self._access_times: Dict[str, datetime] = {}
+        # Monotonic ns of last access; only ever compared with each other
+        self._access_times: Dict[str, int] = {}
+        # compress_context() results per conversation, tagged with updated_at
+        self._compressed: Dict[str, Tuple[datetime, Dict[str, Any]]] = {}
     
     # ========================================
     # Context CRUD Operations
@@ -72,12 +83,12 @@ class ContextManager:
             context.user.user_id = user_id
         
         self._contexts[context.conversation_id] = context
-        self._access_times[context.conversation_id] = datetime.utcnow()
+        self._access_times[context.conversation_id] = time.monotonic_ns()
         
         # Cleanup old contexts if needed
         self._cleanup_old_contexts()
         
-        logger.debug(f"Created new context: {context.conversation_id}")
+        logger.debug("Created new context: %s", context.conversation_id)
         return context
     
     def get_context(self, conversation_id: str) -> Optional[ConversationContext]:
@@ -92,7 +103,8 @@ class ContextManager:
         """
         context = self._contexts.get(conversation_id)
         if context:
-            self._access_times[conversation_id] = datetime.utcnow()
+            self._contexts.move_to_end(conversation_id)
+            self._access_times[conversation_id] = time.monotonic_ns()
         return context
     
     def update_context(
@@ -116,7 +128,7 @@ class ContextManager:
         
         # Apply updates
         for key, value in updates.items():
-            if hasattr(context, key):
+            if key in _UPDATABLE_FIELDS:
                 setattr(context, key, value)
         
         context.updated_at = datetime.utcnow()
@@ -135,6 +147,7 @@ class ContextManager:
         if conversation_id in self._contexts:
             del self._contexts[conversation_id]
             del self._access_times[conversation_id]
+            self._compressed.pop(conversation_id, None)
             return True
         return False
     
@@ -188,6 +201,7 @@ class ContextManager:
                 context.user.financial.budget_min = budget_min
             if budget_max is not None:
                 context.user.financial.budget_max = budget_max
+            context.updated_at = datetime.utcnow()
     
     # ========================================
     # Search Context Management
@@ -213,11 +227,10 @@ class ContextManager:
                 results_count=results_count
             )
             
-            # Add to recent searches
+            # Add to recent searches (bounded deque keeps the most recent)
             if query not in context.user.recent_searches:
                 context.user.recent_searches.append(query)
-                # Keep only last 20 searches
-                context.user.recent_searches = context.user.recent_searches[-20:]
+            context.updated_at = datetime.utcnow()
     
     # ========================================
     # Product Context Management
@@ -232,14 +245,14 @@ class ContextManager:
         """Add a viewed product to the context."""
         context = self.get_context(conversation_id)
         if context:
-            if product_id not in context.products.product_ids:
-                context.products.product_ids.append(product_id)
+            context.products.product_ids.setdefault(product_id, None)
             if product_data:
                 context.products.product_details[product_id] = product_data
             
             # Also add to user's viewed products
             if product_id not in context.user.viewed_products:
                 context.user.viewed_products.append(product_id)
+            context.updated_at = datetime.utcnow()
     
     def add_recommended_products(
         self,
@@ -249,9 +262,10 @@ class ContextManager:
         """Add recommended products to the context."""
         context = self.get_context(conversation_id)
         if context:
+            recommended = context.products.recommended_products
             for pid in product_ids:
-                if pid not in context.products.recommended_products:
-                    context.products.recommended_products.append(pid)
+                recommended.setdefault(pid, None)
+            context.updated_at = datetime.utcnow()
     
     def mark_product_rejected(
         self,
@@ -262,8 +276,8 @@ class ContextManager:
         """Mark a product as rejected by the user."""
         context = self.get_context(conversation_id)
         if context:
-            if product_id not in context.products.rejected_products:
-                context.products.rejected_products.append(product_id)
+            context.products.rejected_products.setdefault(product_id, None)
+            context.updated_at = datetime.utcnow()
     
     # ========================================
     # Context Compression
@@ -288,7 +302,7 @@ class ContextManager:
         """
         compressed = {
             "conversation_id": context.conversation_id,
-            "stage": context.stage.value,
+            "stage": context.stage.label,
             "user": {
                 "id": context.user.user_id,
                 "persona": context.user.persona_type,
@@ -298,7 +312,7 @@ class ContextManager:
             },
             "recent_messages": [
                 {"role": m["role"], "content": m["content"][:200]}
-                for m in context.messages[-max_messages:]
+                for m in context.get_recent_messages(max_messages)
             ],
         }
         
@@ -310,7 +324,9 @@ class ContextManager:
             }
         
         if include_products and context.products.recommended_products:
-            compressed["recommended_products"] = context.products.recommended_products[:5]
+            compressed["recommended_products"] = list(
+                islice(context.products.recommended_products, 5)
+            )
         
         return compressed
     
@@ -322,35 +338,45 @@ class ContextManager:
         """
         Get context optimized for a specific agent type.
         
-        Different agents need different context details.
+        Different agents need different context details. The shared
+        compressed part is reused until ``context.updated_at`` changes,
+        which every ContextManager mutator refreshes.
         """
         context = self.get_context(conversation_id)
         if not context:
             return {}
         
-        base = self.compress_context(context)
+        # Sibling agents in the same turn share one compression; the copy
+        # keeps agent-specific keys out of the cached dict
+        cached = self._compressed.get(conversation_id)
+        if cached is None or cached[0] != context.updated_at:
+            cached = (context.updated_at, self.compress_context(context))
+            self._compressed[conversation_id] = cached
+        base = dict(cached[1])
         
         if agent_type == "search":
             # SearchAgent needs search history and preferences
-            base["recent_searches"] = context.user.recent_searches[-5:]
+            searches = context.user.recent_searches
+            base["recent_searches"] = list(islice(searches, max(0, len(searches) - 5), None))
             base["preferred_brands"] = context.user.preferred_brands
             
         elif agent_type == "recommendation":
             # RecommendationAgent needs full user profile
             base["full_financial"] = context.user.financial.to_dict()
             base["purchase_history"] = context.user.purchased_products[-10:]
-            base["viewed_products"] = context.user.viewed_products[-10:]
+            viewed = context.user.viewed_products
+            base["viewed_products"] = list(islice(viewed, max(0, len(viewed) - 10), None))
             
         elif agent_type == "explainability":
             # ExplainabilityAgent needs product details
             base["product_details"] = {
                 pid: context.products.product_details.get(pid, {})
-                for pid in context.products.recommended_products[:3]
+                for pid in islice(context.products.recommended_products, 3)
             }
             
         elif agent_type == "alternative":
             # AlternativeAgent needs rejected products and constraints
-            base["rejected_products"] = context.products.rejected_products
+            base["rejected_products"] = list(context.products.rejected_products)
             base["constraints_failed"] = True  # Indicates why alternative was called
         
         return base
@@ -361,11 +387,11 @@ class ContextManager:
     
     def serialize_context(self, context: ConversationContext) -> str:
         """Serialize context to JSON string."""
-        return json.dumps(context.to_dict(), default=str)
+        return orjson.dumps(context.to_dict(), default=str).decode()
     
     def deserialize_context(self, data: str) -> ConversationContext:
         """Deserialize context from JSON string."""
-        parsed = json.loads(data)
+        parsed = orjson.loads(data)
         # Reconstruct context from dictionary
         context = ConversationContext()
         context.conversation_id = parsed.get("conversation_id", context.conversation_id)
@@ -377,36 +403,33 @@ class ContextManager:
     # ========================================
     
     def _cleanup_old_contexts(self):
-        """Remove old contexts if over limit."""
-        if len(self._contexts) <= self._max_history:
-            return
-        
-        # Sort by access time and remove oldest
-        sorted_ids = sorted(
-            self._access_times.items(),
-            key=lambda x: x[1]
-        )
-        
-        # Remove oldest 20%
-        to_remove = int(len(sorted_ids) * 0.2)
-        for conv_id, _ in sorted_ids[:to_remove]:
-            self.delete_context(conv_id)
+        """Evict least recently used contexts while over the limit."""
+        removed = 0
+        while len(self._contexts) > self._max_history:
+            conv_id, _ = self._contexts.popitem(last=False)
+            del self._access_times[conv_id]
+            self._compressed.pop(conv_id, None)
+            removed += 1
         
-        logger.info(f"Cleaned up {to_remove} old contexts")
+        if removed:
+            logger.info("Cleaned up %d old contexts", removed)
     
     def cleanup_expired(self, max_age_hours: int = 24):
-        """Remove contexts older than max_age_hours."""
-        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
-        to_remove = [
-            conv_id for conv_id, access_time in self._access_times.items()
-            if access_time < cutoff
-        ]
+        """Remove contexts not accessed for more than max_age_hours."""
+        cutoff = time.monotonic_ns() - max_age_hours * 3_600_000_000_000
+        
+        # Contexts are in access order, so stop at the first fresh one
+        to_remove = []
+        for conv_id in self._contexts:
+            if self._access_times[conv_id] >= cutoff:
+                break
+            to_remove.append(conv_id)
         
         for conv_id in to_remove:
             self.delete_context(conv_id)
         
         if to_remove:
-            logger.info(f"Cleaned up {len(to_remove)} expired contexts")
+            logger.info("Cleaned up %d expired contexts", len(to_remove))
 
 
 # Global context manager instance
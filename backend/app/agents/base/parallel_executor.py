@@ -0,0 +1,81 @@
+"""
+Parallel Agent Executor for FinFind.
+
+AgentExecutor variant that runs the tool calls of a single LLM step
+concurrently, bounded by a per-executor concurrency limit.
+"""
+
+import asyncio
+import contextvars
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterator, Optional
+
+from langchain_classic.agents import AgentExecutor
+from langchain_core.agents import AgentStep
+from pydantic import PrivateAttr
+
+# Thread pool of the sync step currently being executed, if any
+_STEP_POOL: contextvars.ContextVar[Optional[ThreadPoolExecutor]] = contextvars.ContextVar(
+    "finfind_step_pool", default=None
+)
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that dispatches independent tool calls concurrently.
+
+    When the LLM emits several tool calls in one step, they run at the
+    same time instead of one after another, so the step takes as long as
+    the slowest tool rather than the sum of all of them.
+
+    - Async (``ainvoke``): LangChain already gathers the calls; each call
+      additionally acquires a semaphore of ``tool_concurrency_limit``.
+    - Sync (``invoke``): calls are submitted to a thread pool of
+      ``tool_concurrency_limit`` workers and collected in order.
+    """
+
+    tool_concurrency_limit: int = 5
+
+    # One semaphore per event loop; asyncio primitives are loop-bound
+    _semaphores: weakref.WeakKeyDictionary = PrivateAttr(
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the tool semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.tool_concurrency_limit)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _aperform_agent_action(self, *args, **kwargs) -> AgentStep:
+        async with self._get_semaphore():
+            return await super()._aperform_agent_action(*args, **kwargs)
+
+    def _perform_agent_action(self, *args, **kwargs) -> Any:
+        pool = _STEP_POOL.get()
+        if pool is None:
+            return super()._perform_agent_action(*args, **kwargs)
+
+        # Copy the context so callbacks and tracing follow the call
+        ctx = contextvars.copy_context()
+        return pool.submit(ctx.run, super()._perform_agent_action, *args, **kwargs)
+
+    def _iter_next_step(self, *args, **kwargs) -> Iterator[Any]:
+        with ThreadPoolExecutor(
+            max_workers=self.tool_concurrency_limit,
+            thread_name_prefix="agent-tool"
+        ) as pool:
+            token = _STEP_POOL.set(pool)
+            try:
+                # Exhausting the parent generator submits every tool call
+                items = list(super()._iter_next_step(*args, **kwargs))
+            finally:
+                _STEP_POOL.reset(token)
+
+            steps = [item.result() if isinstance(item, Future) else item for item in items]
+
+        yield from steps
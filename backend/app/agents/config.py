@@ -6,14 +6,31 @@ LLM settings, Qdrant connection, and agent-specific parameters.
 """
 
 import os
+import threading
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from enum import Enum
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Environment settings, read once at import rather than per config instance
+_GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+_GROQ_FALLBACK_MODEL = os.getenv("GROQ_FALLBACK_MODEL", "llama-3.1-8b-instant")
+_GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+_GROQ_CONTEXT_WINDOW = int(os.getenv("GROQ_CONTEXT_WINDOW", "8192"))
+_LLM_PROMPT_CACHE_CONTROL = os.getenv("LLM_PROMPT_CACHE_CONTROL", "false").lower() == "true"
+_QDRANT_URL = os.getenv("QDRANT_URL", "")
+_QDRANT_API_KEY = os.getenv("QDRANT_API_KEY", "")
+_QDRANT_PRODUCTS_COLLECTION = os.getenv("QDRANT_PRODUCTS_COLLECTION", "products")
+_QDRANT_USER_PROFILES_COLLECTION = os.getenv("QDRANT_USER_PROFILES_COLLECTION", "user_profiles")
+_QDRANT_REVIEWS_COLLECTION = os.getenv("QDRANT_REVIEWS_COLLECTION", "reviews")
+_QDRANT_INTERACTIONS_COLLECTION = os.getenv("QDRANT_INTERACTIONS_COLLECTION", "user_interactions")
+_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+_DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+_LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
 
 class AgentType(str, Enum):
     """Types of agents in the system."""
@@ -30,56 +47,48 @@ class SearchStrategy(str, Enum):
     HYBRID = "hybrid"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LLMConfig:
     """Configuration for the LLM provider (Groq)."""
     
     provider: str = "groq"
-    model: str = field(
-        default_factory=lambda: os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
-    )
+    model: str = _GROQ_MODEL
     # Fallback model for rate limiting or when primary model fails
-    fallback_model: str = field(
-        default_factory=lambda: os.getenv("GROQ_FALLBACK_MODEL", "llama-3.1-8b-instant")
-    )
-    api_key: str = field(
-        default_factory=lambda: os.getenv("GROQ_API_KEY", "")
-    )
+    fallback_model: str = _GROQ_FALLBACK_MODEL
+    api_key: str = _GROQ_API_KEY
     temperature: float = 0.1
     max_tokens: int = 4096
+    # Prompt + output token budget; chat history is trimmed to fit
+    context_window: int = _GROQ_CONTEXT_WINDOW
     timeout: int = 60
     max_retries: int = 3
     use_fallback_on_rate_limit: bool = True
+    # Reuse the final answer text for identical requests from the same
+    # user context. Opt-in, and only applied when temperature is 0
+    # (deterministic outputs); tool data may be up to the TTL old.
+    cache_responses: bool = False
+    response_cache_ttl: int = 600
+    # Mark the static system prompt with a cache_control breakpoint, for
+    # providers that accept explicit prompt-caching markers
+    prompt_cache_control: bool = _LLM_PROMPT_CACHE_CONTROL
     
     # Rate limiting
     requests_per_minute: int = 30
     tokens_per_minute: int = 14400
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class QdrantConfig:
     """Configuration for Qdrant Cloud connection."""
     
-    url: str = field(
-        default_factory=lambda: os.getenv("QDRANT_URL", "")
-    )
-    api_key: str = field(
-        default_factory=lambda: os.getenv("QDRANT_API_KEY", "")
-    )
+    url: str = _QDRANT_URL
+    api_key: str = _QDRANT_API_KEY
     
     # Collection names
-    products_collection: str = field(
-        default_factory=lambda: os.getenv("QDRANT_PRODUCTS_COLLECTION", "products")
-    )
-    user_profiles_collection: str = field(
-        default_factory=lambda: os.getenv("QDRANT_USER_PROFILES_COLLECTION", "user_profiles")
-    )
-    reviews_collection: str = field(
-        default_factory=lambda: os.getenv("QDRANT_REVIEWS_COLLECTION", "reviews")
-    )
-    interactions_collection: str = field(
-        default_factory=lambda: os.getenv("QDRANT_INTERACTIONS_COLLECTION", "user_interactions")
-    )
+    products_collection: str = _QDRANT_PRODUCTS_COLLECTION
+    user_profiles_collection: str = _QDRANT_USER_PROFILES_COLLECTION
+    reviews_collection: str = _QDRANT_REVIEWS_COLLECTION
+    interactions_collection: str = _QDRANT_INTERACTIONS_COLLECTION
     
     # Search settings
     default_limit: int = 10
@@ -87,22 +96,18 @@ class QdrantConfig:
     score_threshold: float = 0.5
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EmbeddingConfig:
     """Configuration for embedding model."""
     
-    model_name: str = field(
-        default_factory=lambda: os.getenv(
-            "EMBEDDING_MODEL", 
-            "sentence-transformers/all-MiniLM-L6-v2"
-        )
-    )
+    model_name: str = _EMBEDDING_MODEL
     dimension: int = 384
     max_seq_length: int = 256
     batch_size: int = 32
+    batch_wait_ms: int = 20
 
 
-@dataclass 
+@dataclass(frozen=True, slots=True)
 class SearchAgentConfig:
     """Configuration specific to SearchAgent."""
     
@@ -121,7 +126,7 @@ class SearchAgentConfig:
     budget_tolerance: float = 0.2  # 20% above budget allowed
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RecommendationAgentConfig:
     """Configuration specific to RecommendationAgent."""
     
@@ -141,7 +146,7 @@ class RecommendationAgentConfig:
     history_window_days: int = 30
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExplainabilityAgentConfig:
     """Configuration specific to ExplainabilityAgent."""
     
@@ -152,11 +157,18 @@ class ExplainabilityAgentConfig:
     include_review_summary: bool = True
     
     # Detail level
-    explanation_detail: str = "detailed"  # brief, detailed, comprehensive
+    # brief, detailed, comprehensive; "brief" also lets get_explanation()
+    # render brief requests locally instead of calling the LLM
+    explanation_detail: str = "detailed"
     max_factors: int = 5
+    
+    # Seconds to reuse a direct get_explanation() result
+    explanation_cache_ttl: int = 600
+    # Products explained at the same time by explain_multiple()
+    max_concurrent_explanations: int = 8
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AlternativeAgentConfig:
     """Configuration specific to AlternativeAgent."""
     
@@ -164,6 +176,7 @@ class AlternativeAgentConfig:
     price_range_step: float = 0.1  # 10% step for price adjustments
     max_price_adjustments: int = 5
     min_similarity_score: float = 0.6
+    max_feasible_discount: float = 0.8  # Skip the LLM if budget needs a deeper cut
     
     # Alternative types
     include_downgrades: bool = True
@@ -172,9 +185,13 @@ class AlternativeAgentConfig:
     
     # Limits
     alternatives_per_type: int = 3
+    
+    # Similarity search batching across concurrent requests
+    search_batch_size: int = 16
+    search_batch_wait_ms: int = 5
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class A2AConfig:
     """Configuration for Agent-to-Agent communication."""
     
@@ -190,34 +207,68 @@ class A2AConfig:
     log_communications: bool = True
 
 
-@dataclass
+# Shared defaults for AgentConfig; safe to share because configs are frozen
+_DEFAULT_LLM = LLMConfig()
+_DEFAULT_QDRANT = QdrantConfig()
+_DEFAULT_EMBEDDING = EmbeddingConfig()
+_DEFAULT_SEARCH = SearchAgentConfig()
+_DEFAULT_RECOMMENDATION = RecommendationAgentConfig()
+_DEFAULT_EXPLAINABILITY = ExplainabilityAgentConfig()
+_DEFAULT_ALTERNATIVE = AlternativeAgentConfig()
+_DEFAULT_A2A = A2AConfig()
+
+
+@dataclass(frozen=True, slots=True)
 class AgentConfig:
     """Master configuration for the agent system."""
     
     # Core configurations
-    llm: LLMConfig = field(default_factory=LLMConfig)
-    qdrant: QdrantConfig = field(default_factory=QdrantConfig)
-    embedding: EmbeddingConfig = field(default_factory=EmbeddingConfig)
+    llm: LLMConfig = _DEFAULT_LLM
+    qdrant: QdrantConfig = _DEFAULT_QDRANT
+    embedding: EmbeddingConfig = _DEFAULT_EMBEDDING
     
     # Agent-specific configurations
-    search: SearchAgentConfig = field(default_factory=SearchAgentConfig)
-    recommendation: RecommendationAgentConfig = field(default_factory=RecommendationAgentConfig)
-    explainability: ExplainabilityAgentConfig = field(default_factory=ExplainabilityAgentConfig)
-    alternative: AlternativeAgentConfig = field(default_factory=AlternativeAgentConfig)
+    search: SearchAgentConfig = _DEFAULT_SEARCH
+    recommendation: RecommendationAgentConfig = _DEFAULT_RECOMMENDATION
+    explainability: ExplainabilityAgentConfig = _DEFAULT_EXPLAINABILITY
+    alternative: AlternativeAgentConfig = _DEFAULT_ALTERNATIVE
     
     # A2A configuration
-    a2a: A2AConfig = field(default_factory=A2AConfig)
+    a2a: A2AConfig = _DEFAULT_A2A
+    
+    # Max tool calls from one LLM step that run at the same time
+    tool_concurrency_limit: int = 5
+    
+    # Warm embeddings and DB clients while the LLM call is in flight
+    # (opt-in; only agents with a query-embedding search tool prefetch)
+    speculative_prefetch: bool = False
     
     # System settings
-    debug: bool = field(
-        default_factory=lambda: os.getenv("DEBUG", "false").lower() == "true"
-    )
-    log_level: str = field(
-        default_factory=lambda: os.getenv("LOG_LEVEL", "INFO")
-    )
+    debug: bool = _DEBUG
+    log_level: str = _LOG_LEVEL
+    
+    # validate() and to_dict() results, computed once (the config is frozen)
+    _errors: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _dict_view: Dict[str, Any] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "_errors", tuple(self._compute_errors()))
+        object.__setattr__(self, "_dict_view", self._compute_dict())
     
     def validate(self) -> List[str]:
         """Validate configuration and return list of errors."""
+        return list(self._errors)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert config to dictionary (masks sensitive values).
+        
+        The returned dict is shared between calls; do not mutate it.
+        """
+        return self._dict_view
+    
+    def _compute_errors(self) -> List[str]:
+        """Check required settings."""
         errors = []
         
         if not self.llm.api_key:
@@ -231,8 +282,8 @@ class AgentConfig:
         
         return errors
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert config to dictionary (masks sensitive values)."""
+    def _compute_dict(self) -> Dict[str, Any]:
+        """Build the masked dictionary view."""
         return {
             "llm": {
                 "provider": self.llm.provider,
@@ -256,17 +307,22 @@ class AgentConfig:
 
 # Global config instance
 _config: Optional[AgentConfig] = None
+_config_lock = threading.Lock()
 
 
 def get_config() -> AgentConfig:
     """Get or create the global config instance."""
     global _config
     if _config is None:
-        _config = AgentConfig()
+        # Double-checked so concurrent first calls build a single instance
+        with _config_lock:
+            if _config is None:
+                _config = AgentConfig()
     return _config
 
 
 def set_config(config: AgentConfig):
     """Set the global config instance."""
     global _config
-    _config = config
+    with _config_lock:
+        _config = config
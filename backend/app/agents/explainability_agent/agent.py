@@ -5,12 +5,18 @@ Generates transparent explanations for why products are
 recommended, including semantic and financial analysis.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
 
+import numpy as np
 from langchain_core.tools import BaseTool
 
 from ..base import BaseAgent, AgentState, ConversationContext
+from ..base.base_agent import _run_coroutine_sync
 from ..config import AgentConfig, AgentType, get_config
 from ..tools import (
     GetSimilarityScoreTool,
@@ -21,6 +27,39 @@ from .prompts import EXPLAINABILITY_AGENT_SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
+# Read-only stand-in for a missing nested dict
+_EMPTY = MappingProxyType({})
+
+
+def _fast_brief_explanation(
+    product: Dict,
+    query: Optional[str],
+    similarity_score: Optional[float],
+    fit_level: Optional[str]
+) -> str:
+    """
+    Render a one-line brief explanation without calling the LLM.
+    
+    Args:
+        product: Product data.
+        query: Optional search query.
+        similarity_score: Semantic match score (0-1), if computed.
+        fit_level: Financial fit level, if analyzed.
+        
+    Returns:
+        Explanation sentence.
+    """
+    title = product.get('title') or 'This product'
+    if query and similarity_score is not None:
+        text = f"{title} matches '{query}' ({similarity_score:.0%} relevance)"
+    elif query:
+        text = f"{title} matches '{query}'"
+    else:
+        text = f"{title} is a good match"
+    if fit_level:
+        text = f"{text} and fits your budget ({fit_level})"
+    return f"{text}."
+
 
 class ExplainabilityAgent(BaseAgent):
     """
@@ -43,15 +82,20 @@ class ExplainabilityAgent(BaseAgent):
         tools: Optional[List[BaseTool]] = None
     ):
         """Initialize the ExplainabilityAgent."""
+        # Shared by the LLM agent and get_explanation()
+        self._similarity_tool = GetSimilarityScoreTool()
+        self._financial_tool = ExplainFinancialFitTool()
+        self._explanation_tool = GenerateExplanationTool()
+        
         super().__init__(config, tools)
         self._explain_config = self.config.explainability
     
     def _create_default_tools(self) -> List[BaseTool]:
         """Create the default tools for ExplainabilityAgent."""
         return [
-            GetSimilarityScoreTool(),
-            ExplainFinancialFitTool(),
-            GenerateExplanationTool()
+            self._similarity_tool,
+            self._financial_tool,
+            self._explanation_tool
         ]
     
     def _get_system_prompt(self) -> str:
@@ -79,20 +123,7 @@ class ExplainabilityAgent(BaseAgent):
         Returns:
             AgentState with explanation.
         """
-        # Build comprehensive input
-        explain_input = f"Explain why this product is recommended:\n"
-        explain_input += f"Product: {product.get('title', 'Unknown')}\n"
-        explain_input += f"Price: ${product.get('price', 'N/A')}\n"
-        explain_input += f"Category: {product.get('category', 'N/A')}\n"
-        explain_input += f"Rating: {product.get('rating', 'N/A')}/5\n"
-        
-        if query:
-            explain_input += f"\nOriginal search: {query}"
-        
-        if context and context.user:
-            explain_input += f"\nUser budget: ${context.user.financial.budget_max}"
-        
-        explain_input += f"\n\nProvide a {explanation_type} explanation."
+        explain_input = self._build_explain_input(product, query, context, explanation_type)
         
         # Run the agent
         state = await self.run(explain_input, state, context)
@@ -108,15 +139,34 @@ class ExplainabilityAgent(BaseAgent):
         explanation_type: str = "detailed"
     ) -> AgentState:
         """Synchronous version of explain()."""
-        explain_input = f"Explain why this product is recommended:\n"
-        explain_input += f"Product: {product.get('title', 'Unknown')}\n"
-        explain_input += f"Price: ${product.get('price', 'N/A')}\n"
-        
-        if query:
-            explain_input += f"\nOriginal search: {query}"
+        explain_input = self._build_explain_input(product, query, context, explanation_type)
         
         return self.run_sync(explain_input, state, context)
     
+    @staticmethod
+    def _build_explain_input(
+        product: Dict,
+        query: Optional[str],
+        context: Optional[ConversationContext],
+        explanation_type: str
+    ) -> str:
+        """Build the agent input for explain() and explain_sync()."""
+        query_line = f"\nOriginal search: {query}" if query else ""
+        budget_line = ""
+        if context and context.user:
+            budget_line = f"\nUser budget: ${context.user.financial.budget_max}"
+        
+        return (
+            f"Explain why this product is recommended:\n"
+            f"Product: {product.get('title', 'Unknown')}\n"
+            f"Price: ${product.get('price', 'N/A')}\n"
+            f"Category: {product.get('category', 'N/A')}\n"
+            f"Rating: {product.get('rating', 'N/A')}/5\n"
+            f"{query_line}"
+            f"{budget_line}"
+            f"\n\nProvide a {explanation_type} explanation."
+        )
+    
     def get_explanation(
         self,
         product: Dict,
@@ -127,7 +177,8 @@ class ExplainabilityAgent(BaseAgent):
         """
         Get explanation without full agent execution.
         
-        Directly calls tools for faster results.
+        Directly calls tools for faster results. Results are cached per
+        product, profile, query, explanation type and explanation config.
         
         Args:
             product: Product data.
@@ -138,23 +189,40 @@ class ExplainabilityAgent(BaseAgent):
         Returns:
             Dictionary with explanation components.
         """
-        # Get tools
-        similarity_tool = GetSimilarityScoreTool()
-        financial_tool = ExplainFinancialFitTool()
-        explanation_tool = GenerateExplanationTool()
+        # Check cache (imported here: services imports the MCP package,
+        # which would be circular at module load)
+        from ..services import get_cache_service
+        cache = get_cache_service()
+        cache_key = hashlib.sha256(json.dumps(
+            [
+                product, user_profile, query, explanation_type,
+                self._explain_config.include_similarity_score,
+                self._explain_config.include_financial_analysis,
+                self._explain_config.explanation_detail
+            ],
+            sort_keys=True,
+            default=str
+        ).encode()).hexdigest()
+        cached = cache.get("explanations", cache_key)
+        if cached:
+            return cached
+        
+        product_id = product.get('id')
+        original_id = product.get('original_id')
+        price = product.get('price')
         
         result = {
-            "product_id": product.get('id') or product.get('original_id'),
+            "product_id": product_id or original_id,
             "product_title": product.get('title'),
             "components": {}
         }
         
-        # Get similarity explanation if query provided
+        # Get similarity explanation if query provided (and enabled)
         similarity_score = None
-        if query and product.get('id'):
-            sim_result = similarity_tool._run(
+        if self._explain_config.include_similarity_score and query and product_id:
+            sim_result = self._similarity_tool._run(
                 query=query,
-                product_id=product.get('original_id', product.get('id')),
+                product_id=original_id if 'original_id' in product else product_id,
                 include_matching_terms=True
             )
             if sim_result.get('success'):
@@ -166,15 +234,19 @@ class ExplainabilityAgent(BaseAgent):
                 }
                 similarity_score = sim_result.get('similarity_score')
         
-        # Get financial fit explanation if user profile provided
+        # Get financial fit explanation if user profile provided (and enabled)
         affordability_score = None
-        if user_profile and product.get('price'):
-            financial = user_profile.get('financial_context', {})
-            fin_result = financial_tool._run(
-                product_price=product.get('price'),
+        if (
+            self._explain_config.include_financial_analysis
+            and user_profile
+            and price
+        ):
+            financial = user_profile.get('financial_context') or _EMPTY
+            fin_result = self._financial_tool._run(
+                product_price=price,
                 user_budget_max=financial.get('budget_max'),
                 user_monthly_income=financial.get('monthly_budget'),
-                affordability_score=product.get('affordability', {}).get('score')
+                affordability_score=(product.get('affordability') or _EMPTY).get('score')
             )
             if fin_result.get('success'):
                 result['components']['financial_fit'] = {
@@ -185,20 +257,45 @@ class ExplainabilityAgent(BaseAgent):
                 }
                 affordability_score = fin_result.get('affordability_score')
         
-        # Generate comprehensive explanation
-        exp_result = explanation_tool._run(
-            product=product,
-            user_profile=user_profile,
-            query=query,
-            similarity_score=similarity_score,
-            affordability_score=affordability_score,
-            explanation_type=explanation_type
-        )
+        # Brief-only configurations are rendered locally, skipping the LLM.
+        # Opt-in: with the default explanation_detail ("detailed") brief
+        # requests, including explain_multiple()'s, still go to the LLM.
+        if (
+            explanation_type == "brief"
+            and self._explain_config.explanation_detail == "brief"
+        ):
+            exp_result = {
+                "success": True,
+                "explanation": _fast_brief_explanation(
+                    product,
+                    query,
+                    similarity_score,
+                    result['components'].get('financial_fit', _EMPTY).get('level')
+                )
+            }
+        else:
+            # Generate comprehensive explanation
+            exp_result = self._explanation_tool._run(
+                product=product,
+                user_profile=user_profile,
+                query=query,
+                similarity_score=similarity_score,
+                affordability_score=affordability_score,
+                explanation_type=explanation_type
+            )
         
         result['explanation'] = exp_result.get('explanation', '')
         result['explanation_type'] = explanation_type
         result['success'] = True
         
+        # Fallback text from a failed generation is not worth keeping
+        if exp_result.get('success'):
+            cache.set(
+                "explanations",
+                cache_key,
+                result,
+                ttl=self._explain_config.explanation_cache_ttl
+            )
         return result
     
     def explain_multiple(
@@ -207,10 +304,26 @@ class ExplainabilityAgent(BaseAgent):
         user_profile: Optional[Dict] = None,
         query: Optional[str] = None,
         explanation_type: str = "brief"
+    ) -> List[Dict]:
+        """Synchronous version of aexplain_multiple()."""
+        return _run_coroutine_sync(
+            self.aexplain_multiple(products, user_profile, query, explanation_type)
+        )
+    
+    async def aexplain_multiple(
+        self,
+        products: List[Dict],
+        user_profile: Optional[Dict] = None,
+        query: Optional[str] = None,
+        explanation_type: str = "brief"
     ) -> List[Dict]:
         """
         Generate explanations for multiple products.
         
+        Products are explained concurrently in worker threads, at most
+        ``max_concurrent_explanations`` at a time, so the LLM calls
+        overlap instead of running back to back.
+        
         Args:
             products: List of products to explain.
             user_profile: Optional user profile.
@@ -218,20 +331,21 @@ class ExplainabilityAgent(BaseAgent):
             explanation_type: Type of explanation.
             
         Returns:
-            List of explanation dictionaries.
+            List of explanation dictionaries, in product order.
         """
-        explanations = []
+        semaphore = asyncio.Semaphore(self._explain_config.max_concurrent_explanations)
         
-        for product in products:
-            exp = self.get_explanation(
-                product=product,
-                user_profile=user_profile,
-                query=query,
-                explanation_type=explanation_type
-            )
-            explanations.append(exp)
+        async def explain(product: Dict) -> Dict:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.get_explanation,
+                    product=product,
+                    user_profile=user_profile,
+                    query=query,
+                    explanation_type=explanation_type
+                )
         
-        return explanations
+        return list(await asyncio.gather(*(explain(p) for p in products)))
     
     def compare_products(
         self,
@@ -259,60 +373,77 @@ class ExplainabilityAgent(BaseAgent):
             "comparison_points": []
         }
         
+        include_financial = self._explain_config.include_financial_analysis
+        include_reviews = self._explain_config.include_review_summary
+        
+        # Budget is the same for every product
+        budget_max = None
+        if user_profile and include_financial:
+            budget_max = (user_profile.get('financial_context') or _EMPTY).get('budget_max')
+        
         # Analyze each product
         for product in products:
+            price = product.get('price')
             analysis = {
                 "id": product.get('id') or product.get('original_id'),
                 "title": product.get('title'),
-                "price": product.get('price'),
+                "price": price,
                 "rating": product.get('rating'),
                 "category": product.get('category')
             }
             
             # Calculate affordability if user profile available
-            if user_profile:
-                budget_max = user_profile.get('financial_context', {}).get('budget_max')
-                if budget_max and product.get('price'):
-                    price = product['price']
-                    analysis['budget_percentage'] = round(price / budget_max * 100, 1)
-                    analysis['within_budget'] = price <= budget_max
+            if budget_max and price:
+                analysis['budget_percentage'] = round(price / budget_max * 100, 1)
+                analysis['within_budget'] = price <= budget_max
             
             comparison['products'].append(analysis)
         
         # Generate comparison points
+        if not (include_financial or include_reviews):
+            comparison['success'] = True
+            return comparison
+        
         prices = [p.get('price', 0) for p in products]
         ratings = [p.get('rating', 0) for p in products]
+        price_arr = np.array(prices, dtype=np.float64)
+        rating_arr = np.array(ratings, dtype=np.float64)
         
         # Price comparison
-        min_price_idx = prices.index(min(prices))
-        max_price_idx = prices.index(max(prices))
-        comparison['comparison_points'].append({
-            "factor": "price",
-            "best": products[min_price_idx].get('title'),
-            "note": f"${min(prices)} vs ${max(prices)}"
-        })
-        
-        # Rating comparison
-        if any(ratings):
-            max_rating_idx = ratings.index(max(ratings))
+        if include_financial:
+            min_price_idx = int(price_arr.argmin())
+            max_price_idx = int(price_arr.argmax())
             comparison['comparison_points'].append({
-                "factor": "rating",
-                "best": products[max_rating_idx].get('title'),
-                "note": f"{max(ratings)}/5 stars"
+                "factor": "price",
+                "best": products[min_price_idx].get('title'),
+                "note": f"${prices[min_price_idx]} vs ${prices[max_price_idx]}"
             })
         
-        # Value score (rating / price)
-        value_scores = [
-            (r / p * 100) if p > 0 else 0 
-            for r, p in zip(ratings, prices)
-        ]
-        if any(value_scores):
-            best_value_idx = value_scores.index(max(value_scores))
-            comparison['comparison_points'].append({
-                "factor": "value",
-                "best": products[best_value_idx].get('title'),
-                "note": "Best rating-to-price ratio"
-            })
+        # Rating comparison
+        if include_reviews:
+            max_rating_idx = int(rating_arr.argmax())
+            if rating_arr[max_rating_idx] > 0:
+                comparison['comparison_points'].append({
+                    "factor": "rating",
+                    "best": products[max_rating_idx].get('title'),
+                    "note": f"{ratings[max_rating_idx]}/5 stars"
+                })
+        
+        # Value score (rating / price), 0 for unpriced products
+        if include_financial:
+            value_scores = np.divide(
+                rating_arr * 100,
+                price_arr,
+                out=np.zeros_like(price_arr),
+                where=price_arr > 0
+            )
+            best_value_idx = int(value_scores.argmax())
+            if value_scores[best_value_idx] > 0:
+                comparison['comparison_points'].append({
+                    "factor": "value",
+                    "best": products[best_value_idx].get('title'),
+                    "note": "Best rating-to-price ratio"
+                })
         
         comparison['success'] = True
         return comparison
@@ -101,3 +101,29 @@ FULL_EXPLANATION_TEMPLATE = """
 
 {additional_notes}
 """
+
+
+# ========================================
+# Render Helpers
+# ========================================
+# Bound format methods, as in the AlternativeAgent prompts; str.format
+# also beats string.Template on these templates.
+
+_render_similarity_explanation = SIMILARITY_EXPLANATION_PROMPT.format
+_render_financial_fit_explanation = FINANCIAL_FIT_EXPLANATION_PROMPT.format
+_render_full_explanation = FULL_EXPLANATION_TEMPLATE.format
+
+
+def render_similarity_explanation(**kwargs) -> str:
+    """Render SIMILARITY_EXPLANATION_PROMPT."""
+    return _render_similarity_explanation(**kwargs)
+
+
+def render_financial_fit_explanation(**kwargs) -> str:
+    """Render FINANCIAL_FIT_EXPLANATION_PROMPT."""
+    return _render_financial_fit_explanation(**kwargs)
+
+
+def render_full_explanation(**kwargs) -> str:
+    """Render FULL_EXPLANATION_TEMPLATE."""
+    return _render_full_explanation(**kwargs)
@@ -37,48 +37,70 @@ from .registry import (
     register_tool,
     execute_tool
 )
-from .registration import (
-    register_all_tools,
-    register_search_tools,
-    register_recommendation_tools,
-    register_explainability_tools,
-    register_alternative_tools,
-    get_tools_for_agent,
-    get_all_tool_instances,
-    get_tool_catalog,
-    ensure_tools_registered,
-    SEARCH_TOOLS,
-    RECOMMENDATION_TOOLS,
-    EXPLAINABILITY_TOOLS,
-    ALTERNATIVE_TOOLS,
-    ALL_TOOLS
-)
+import importlib
 
-# Import tool classes for direct access
-from .tools import (
+# Registration and tool classes pull in services, Qdrant and embedding
+# clients, so they are imported on first access (PEP 562) rather than
+# whenever the protocol or registry is needed.
+_REGISTRATION_NAMES = (
+    "register_all_tools",
+    "register_search_tools",
+    "register_recommendation_tools",
+    "register_explainability_tools",
+    "register_alternative_tools",
+    "get_tools_for_agent",
+    "get_all_tool_instances",
+    "get_tool_catalog",
+    "ensure_tools_registered",
+    "SEARCH_TOOLS",
+    "RECOMMENDATION_TOOLS",
+    "EXPLAINABILITY_TOOLS",
+    "ALTERNATIVE_TOOLS",
+    "ALL_TOOLS",
+)
+_TOOL_NAMES = (
     # Search Tools
-    QdrantSemanticSearchTool,
-    ApplyFinancialFiltersTool,
-    InterpretVagueQueryTool,
-    ImageSimilaritySearchTool,
-    VoiceToTextSearchTool,
+    "QdrantSemanticSearchTool",
+    "ApplyFinancialFiltersTool",
+    "InterpretVagueQueryTool",
+    "ImageSimilaritySearchTool",
+    "VoiceToTextSearchTool",
     # Recommendation Tools
-    GetUserFinancialProfileTool,
-    GetUserInteractionHistoryTool,
-    CalculateAffordabilityMatchTool,
-    RankProductsByConstraintsTool,
-    GetContextualRecommendationsTool,
+    "GetUserFinancialProfileTool",
+    "GetUserInteractionHistoryTool",
+    "CalculateAffordabilityMatchTool",
+    "RankProductsByConstraintsTool",
+    "GetContextualRecommendationsTool",
     # Explainability Tools
-    GetSimilarityExplanationTool,
-    GetFinancialFitExplanationTool,
-    GetAttributeMatchesTool,
-    GenerateNaturalExplanationTool,
+    "GetSimilarityExplanationTool",
+    "GetFinancialFitExplanationTool",
+    "GetAttributeMatchesTool",
+    "GenerateNaturalExplanationTool",
     # Alternative Tools
-    FindSimilarInPriceRangeTool,
-    FindCategoryAlternativesTool,
-    GetDowngradeOptionsTool,
-    GetUpgradePathTool
+    "FindSimilarInPriceRangeTool",
+    "FindCategoryAlternativesTool",
+    "GetDowngradeOptionsTool",
+    "GetUpgradePathTool",
 )
+_LAZY = {
+    **{name: ".registration" for name in _REGISTRATION_NAMES},
+    **{name: ".tools" for name in _TOOL_NAMES},
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
+
 
 __all__ = [
     # Protocol
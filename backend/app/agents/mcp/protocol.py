@@ -5,16 +5,18 @@ Defines the Model Context Protocol standards for tool communication,
 including input/output schemas, error handling, and metadata.
 """
 
+import itertools
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from datetime import datetime
-from enum import Enum
-from typing import Any, Dict, List, Optional, Type, Union
+from datetime import datetime, timezone
+from enum import StrEnum
+from typing import Any, Dict, Iterator, List, Optional, Type, Union
 from functools import wraps
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from langchain_core.tools import BaseTool
 
 logger = logging.getLogger(__name__)
@@ -24,8 +26,13 @@ logger = logging.getLogger(__name__)
 # MCP Error Handling
 # ========================================
 
-class MCPErrorCode(str, Enum):
-    """Standard MCP error codes."""
+class MCPErrorCode(StrEnum):
+    """
+    Standard MCP error codes.
+    
+    Members are plain strings, so they serialize and format as their
+    value without going through ``.value``.
+    """
     
     # Client errors (4xx equivalent)
     INVALID_INPUT = "INVALID_INPUT"
@@ -59,13 +66,13 @@ class MCPError(Exception):
     retry_after: Optional[int] = None  # seconds
     
     def __str__(self):
-        return f"[{self.code.value}] {self.message}"
+        return f"[{self.code}] {self.message}"
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         return {
             "error": True,
-            "code": self.code.value,
+            "code": self.code,
             "message": self.message,
             "details": self.details,
             "recoverable": self.recoverable,
@@ -85,9 +92,8 @@ class MCPToolInput(BaseModel):
     consistent validation and serialization.
     """
     
-    class Config:
-        extra = "forbid"  # Strict validation
-        
+    model_config = ConfigDict(extra="forbid")  # Strict validation
+    
     def validate_constraints(self) -> List[str]:
         """
         Validate business constraints beyond type checking.
@@ -136,6 +142,23 @@ class MCPToolOutput:
         
         return result
     
+    @staticmethod
+    def success_dict(data: Any, execution_time_ms: float = 0.0) -> Dict[str, Any]:
+        """
+        Build the to_dict() form of a plain success response directly.
+        
+        Used for raw tool results, which need no MCPToolOutput instance.
+        """
+        return {
+            "success": True,
+            "metadata": {
+                "execution_time_ms": execution_time_ms,
+                "tokens_used": 0,
+                "cache_hit": False
+            },
+            "data": data
+        }
+    
     @classmethod
     def success_response(
         cls,
@@ -245,13 +268,19 @@ class MCPTool(BaseTool, ABC):
     _call_count: int = 0
     _total_latency_ms: float = 0.0
     _error_count: int = 0
-    _last_called: Optional[datetime] = None
     
-    class Config:
-        arbitrary_types_allowed = True
+    # Tools run concurrently from worker threads. next() on a count is
+    # atomic, so counters need no lock; only the float sum takes one.
+    _calls: Iterator[int] = PrivateAttr(default_factory=lambda: itertools.count(1))
+    _errors: Iterator[int] = PrivateAttr(default_factory=lambda: itertools.count(1))
+    _latency_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _last_called_ts: float = 0.0  # epoch seconds, 0 if never called
+    
+    model_config = ConfigDict(arbitrary_types_allowed=True)
     
+    # Not named ``metadata``: that is a BaseTool field and would shadow it
     @property
-    def metadata(self) -> MCPToolMetadata:
+    def tool_metadata(self) -> MCPToolMetadata:
         """Get tool metadata."""
         if self.mcp_metadata is None:
             return MCPToolMetadata(
@@ -271,39 +300,41 @@ class MCPTool(BaseTool, ABC):
         - Logging
         """
         start_time = time.time()
-        self._call_count += 1
-        self._last_called = datetime.utcnow()
+        self._call_count = next(self._calls)
+        self._last_called_ts = start_time
         
         try:
             # Log tool invocation
-            logger.info(f"MCP Tool '{self.name}' invoked with: {list(kwargs.keys())}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("MCP Tool '%s' invoked with: %s", self.name, list(kwargs))
             
             # Execute the actual tool logic
             result = self._execute(**kwargs)
             
-            # Wrap in MCPToolOutput if not already
-            if not isinstance(result, MCPToolOutput):
-                result = MCPToolOutput.success_response(data=result)
-            
             # Calculate execution time
             execution_time_ms = (time.time() - start_time) * 1000
-            result.execution_time_ms = execution_time_ms
-            self._total_latency_ms += execution_time_ms
+            with self._latency_lock:
+                self._total_latency_ms += execution_time_ms
+            
+            logger.info("MCP Tool '%s' completed in %.2fms", self.name, execution_time_ms)
             
-            logger.info(f"MCP Tool '{self.name}' completed in {execution_time_ms:.2f}ms")
+            if isinstance(result, MCPToolOutput):
+                result.execution_time_ms = execution_time_ms
+                return result.to_dict()
             
-            return result.to_dict()
+            # Raw data skips the MCPToolOutput round trip
+            return MCPToolOutput.success_dict(result, execution_time_ms)
             
         except MCPError as e:
-            self._error_count += 1
+            self._error_count = next(self._errors)
             execution_time_ms = (time.time() - start_time) * 1000
-            logger.error(f"MCP Tool '{self.name}' error: {e}")
+            logger.error("MCP Tool '%s' error: %s", self.name, e)
             return MCPToolOutput.error_response(e, execution_time_ms).to_dict()
             
         except Exception as e:
-            self._error_count += 1
+            self._error_count = next(self._errors)
             execution_time_ms = (time.time() - start_time) * 1000
-            logger.exception(f"MCP Tool '{self.name}' unexpected error: {e}")
+            logger.exception("MCP Tool '%s' unexpected error: %s", self.name, e)
             
             error = MCPError(
                 code=MCPErrorCode.INTERNAL_ERROR,
@@ -315,30 +346,31 @@ class MCPTool(BaseTool, ABC):
     async def _arun(self, **kwargs) -> Dict[str, Any]:
         """Async execution with MCP protocol handling."""
         start_time = time.time()
-        self._call_count += 1
-        self._last_called = datetime.utcnow()
+        self._call_count = next(self._calls)
+        self._last_called_ts = start_time
         
         try:
-            logger.info(f"MCP Tool '{self.name}' async invoked")
+            logger.info("MCP Tool '%s' async invoked", self.name)
             
             result = await self._aexecute(**kwargs)
             
-            if not isinstance(result, MCPToolOutput):
-                result = MCPToolOutput.success_response(data=result)
-            
             execution_time_ms = (time.time() - start_time) * 1000
-            result.execution_time_ms = execution_time_ms
-            self._total_latency_ms += execution_time_ms
+            with self._latency_lock:
+                self._total_latency_ms += execution_time_ms
             
-            return result.to_dict()
+            if isinstance(result, MCPToolOutput):
+                result.execution_time_ms = execution_time_ms
+                return result.to_dict()
+            
+            return MCPToolOutput.success_dict(result, execution_time_ms)
             
         except MCPError as e:
-            self._error_count += 1
+            self._error_count = next(self._errors)
             execution_time_ms = (time.time() - start_time) * 1000
             return MCPToolOutput.error_response(e, execution_time_ms).to_dict()
             
         except Exception as e:
-            self._error_count += 1
+            self._error_count = next(self._errors)
             execution_time_ms = (time.time() - start_time) * 1000
             error = MCPError(
                 code=MCPErrorCode.INTERNAL_ERROR,
@@ -380,15 +412,20 @@ class MCPTool(BaseTool, ABC):
             "error_rate": self._error_count / max(self._call_count, 1),
             "avg_latency_ms": avg_latency,
             "total_latency_ms": self._total_latency_ms,
-            "last_called": self._last_called.isoformat() if self._last_called else None
+            "last_called": (
+                datetime.fromtimestamp(self._last_called_ts, tz=timezone.utc).isoformat()
+                if self._last_called_ts else None
+            )
         }
     
     def reset_stats(self):
         """Reset tool statistics."""
+        self._calls = itertools.count(1)
+        self._errors = itertools.count(1)
         self._call_count = 0
         self._total_latency_ms = 0.0
         self._error_count = 0
-        self._last_called = None
+        self._last_called_ts = 0.0
 
 
 # ========================================
@@ -436,7 +473,7 @@ def mcp_tool(
         def wrapper(*args, **kwargs):
             start_time = time.time()
             try:
-                logger.info(f"MCP Tool '{name}' invoked")
+                logger.info("MCP Tool '%s' invoked", name)
                 result = func(*args, **kwargs)
                 
                 if not isinstance(result, MCPToolOutput):
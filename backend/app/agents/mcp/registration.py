@@ -5,40 +5,15 @@ Registers all MCP tools with the global registry.
 Provides tool discovery and access for agents.
 """
 
+import importlib
 import logging
-from typing import List, Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Tuple, Type
 
 from .protocol import MCPTool
 from .registry import MCPToolRegistry, get_tool_registry
 
-# Import all tools
-from .tools.search_tools import (
-    QdrantSemanticSearchTool,
-    ApplyFinancialFiltersTool,
-    InterpretVagueQueryTool,
-    ImageSimilaritySearchTool,
-    VoiceToTextSearchTool
-)
-from .tools.recommendation_tools import (
-    GetUserFinancialProfileTool,
-    GetUserInteractionHistoryTool,
-    CalculateAffordabilityMatchTool,
-    RankProductsByConstraintsTool,
-    GetContextualRecommendationsTool
-)
-from .tools.explainability_tools import (
-    GetSimilarityExplanationTool,
-    GetFinancialFitExplanationTool,
-    GetAttributeMatchesTool,
-    GenerateNaturalExplanationTool
-)
-from .tools.alternative_tools import (
-    FindSimilarInPriceRangeTool,
-    FindCategoryAlternativesTool,
-    GetDowngradeOptionsTool,
-    GetUpgradePathTool
-)
-
 logger = logging.getLogger(__name__)
 
 
@@ -46,35 +21,40 @@ logger = logging.getLogger(__name__)
 # Tool Categories
 # ========================================
 
-SEARCH_TOOLS = [
-    QdrantSemanticSearchTool,
-    ApplyFinancialFiltersTool,
-    InterpretVagueQueryTool,
-    ImageSimilaritySearchTool,
-    VoiceToTextSearchTool
-]
-
-RECOMMENDATION_TOOLS = [
-    GetUserFinancialProfileTool,
-    GetUserInteractionHistoryTool,
-    CalculateAffordabilityMatchTool,
-    RankProductsByConstraintsTool,
-    GetContextualRecommendationsTool
-]
-
-EXPLAINABILITY_TOOLS = [
-    GetSimilarityExplanationTool,
-    GetFinancialFitExplanationTool,
-    GetAttributeMatchesTool,
-    GenerateNaturalExplanationTool
-]
-
-ALTERNATIVE_TOOLS = [
-    FindSimilarInPriceRangeTool,
-    FindCategoryAlternativesTool,
-    GetDowngradeOptionsTool,
-    GetUpgradePathTool
-]
+# Tools are listed as (module, class name) and imported on first use,
+# so loading this module doesn't import every tool module and its
+# Qdrant / embedding dependencies.
+ToolSpec = Tuple[str, str]
+
+SEARCH_TOOLS = (
+    (".tools.search_tools", "QdrantSemanticSearchTool"),
+    (".tools.search_tools", "ApplyFinancialFiltersTool"),
+    (".tools.search_tools", "InterpretVagueQueryTool"),
+    (".tools.search_tools", "ImageSimilaritySearchTool"),
+    (".tools.search_tools", "VoiceToTextSearchTool")
+)
+
+RECOMMENDATION_TOOLS = (
+    (".tools.recommendation_tools", "GetUserFinancialProfileTool"),
+    (".tools.recommendation_tools", "GetUserInteractionHistoryTool"),
+    (".tools.recommendation_tools", "CalculateAffordabilityMatchTool"),
+    (".tools.recommendation_tools", "RankProductsByConstraintsTool"),
+    (".tools.recommendation_tools", "GetContextualRecommendationsTool")
+)
+
+EXPLAINABILITY_TOOLS = (
+    (".tools.explainability_tools", "GetSimilarityExplanationTool"),
+    (".tools.explainability_tools", "GetFinancialFitExplanationTool"),
+    (".tools.explainability_tools", "GetAttributeMatchesTool"),
+    (".tools.explainability_tools", "GenerateNaturalExplanationTool")
+)
+
+ALTERNATIVE_TOOLS = (
+    (".tools.alternative_tools", "FindSimilarInPriceRangeTool"),
+    (".tools.alternative_tools", "FindCategoryAlternativesTool"),
+    (".tools.alternative_tools", "GetDowngradeOptionsTool"),
+    (".tools.alternative_tools", "GetUpgradePathTool")
+)
 
 ALL_TOOLS = (
     SEARCH_TOOLS +
@@ -83,6 +63,13 @@ ALL_TOOLS = (
     ALTERNATIVE_TOOLS
 )
 
+_AGENT_TOOLS = {
+    "search": SEARCH_TOOLS,
+    "recommendation": RECOMMENDATION_TOOLS,
+    "explainability": EXPLAINABILITY_TOOLS,
+    "alternative": ALTERNATIVE_TOOLS
+}
+
 
 # ========================================
 # Registration Functions
@@ -104,14 +91,14 @@ def register_all_tools(registry: MCPToolRegistry = None) -> MCPToolRegistry:
     registered = []
     failed = []
     
-    for tool_class in ALL_TOOLS:
+    for spec in ALL_TOOLS:
         try:
-            tool = tool_class()
+            tool = _resolve(spec)()
             registry.register(tool)
             registered.append(tool.name)
         except Exception as e:
-            logger.error(f"Failed to register {tool_class.__name__}: {e}")
-            failed.append(tool_class.__name__)
+            logger.error(f"Failed to register {spec[1]}: {e}")
+            failed.append(spec[1])
     
     logger.info(f"Registered {len(registered)} MCP tools")
     if failed:
@@ -126,8 +113,8 @@ def register_search_tools(registry: MCPToolRegistry = None) -> List[MCPTool]:
         registry = get_tool_registry()
     
     tools = []
-    for tool_class in SEARCH_TOOLS:
-        tool = tool_class()
+    for spec in SEARCH_TOOLS:
+        tool = _resolve(spec)()
         registry.register(tool)
         tools.append(tool)
     
@@ -140,8 +127,8 @@ def register_recommendation_tools(registry: MCPToolRegistry = None) -> List[MCPT
         registry = get_tool_registry()
     
     tools = []
-    for tool_class in RECOMMENDATION_TOOLS:
-        tool = tool_class()
+    for spec in RECOMMENDATION_TOOLS:
+        tool = _resolve(spec)()
         registry.register(tool)
         tools.append(tool)
     
@@ -154,8 +141,8 @@ def register_explainability_tools(registry: MCPToolRegistry = None) -> List[MCPT
         registry = get_tool_registry()
     
     tools = []
-    for tool_class in EXPLAINABILITY_TOOLS:
-        tool = tool_class()
+    for spec in EXPLAINABILITY_TOOLS:
+        tool = _resolve(spec)()
         registry.register(tool)
         tools.append(tool)
     
@@ -168,8 +155,8 @@ def register_alternative_tools(registry: MCPToolRegistry = None) -> List[MCPTool
         registry = get_tool_registry()
     
     tools = []
-    for tool_class in ALTERNATIVE_TOOLS:
-        tool = tool_class()
+    for spec in ALTERNATIVE_TOOLS:
+        tool = _resolve(spec)()
         registry.register(tool)
         tools.append(tool)
     
@@ -180,6 +167,23 @@ def register_alternative_tools(registry: MCPToolRegistry = None) -> List[MCPTool
 # Tool Access Functions
 # ========================================
 
+def _resolve(spec: ToolSpec) -> Type[MCPTool]:
+    """Import a tool class from its (module, class name) spec."""
+    module, name = spec
+    return getattr(importlib.import_module(module, __package__), name)
+
+
+@lru_cache(maxsize=None)
+def _instance(spec: ToolSpec) -> MCPTool:
+    """
+    Get the shared instance of a tool class.
+    
+    Building a tool re-runs its Pydantic model setup, so agents share one
+    instance per class; call statistics accumulate across callers.
+    """
+    return _resolve(spec)()
+
+
 def get_tools_for_agent(agent_type: str) -> List[MCPTool]:
     """
     Get the appropriate tools for an agent type.
@@ -190,75 +194,65 @@ def get_tools_for_agent(agent_type: str) -> List[MCPTool]:
     Returns:
         List of tool instances for that agent.
     """
-    tool_map = {
-        "search": SEARCH_TOOLS,
-        "recommendation": RECOMMENDATION_TOOLS,
-        "explainability": EXPLAINABILITY_TOOLS,
-        "alternative": ALTERNATIVE_TOOLS
-    }
-    
-    tool_classes = tool_map.get(agent_type.lower(), [])
-    return [tool_class() for tool_class in tool_classes]
+    specs = _AGENT_TOOLS.get(agent_type.lower(), ())
+    return [_instance(spec) for spec in specs]
 
 
 def get_all_tool_instances() -> List[MCPTool]:
     """Get instances of all tools."""
-    return [tool_class() for tool_class in ALL_TOOLS]
+    return [_instance(spec) for spec in ALL_TOOLS]
+
 
+# Tool classes are fixed at import, so the catalog is built once
+_catalog: Optional[Mapping[str, Any]] = None
 
-def get_tool_catalog() -> Dict[str, Any]:
+
+def get_tool_catalog() -> Mapping[str, Any]:
     """
     Get a catalog of all available tools.
     
+    The catalog is built on first call and shared afterwards, so it is
+    returned as a read-only view: mappings are MappingProxyType and
+    lists are tuples.
+    
     Returns:
-        Dictionary with tool information organized by category.
+        Mapping with tool information organized by category.
     """
-    catalog = {
-        "search": [],
-        "recommendation": [],
-        "explainability": [],
-        "alternative": []
-    }
-    
-    for tool_class in SEARCH_TOOLS:
-        tool = tool_class()
-        catalog["search"].append({
-            "name": tool.name,
-            "description": tool.description.strip(),
-            "metadata": tool.metadata.to_dict()
-        })
-    
-    for tool_class in RECOMMENDATION_TOOLS:
-        tool = tool_class()
-        catalog["recommendation"].append({
-            "name": tool.name,
-            "description": tool.description.strip(),
-            "metadata": tool.metadata.to_dict()
-        })
-    
-    for tool_class in EXPLAINABILITY_TOOLS:
-        tool = tool_class()
-        catalog["explainability"].append({
-            "name": tool.name,
-            "description": tool.description.strip(),
-            "metadata": tool.metadata.to_dict()
-        })
+    global _catalog
+    if _catalog is None:
+        _catalog = _freeze(_build_tool_catalog())
+    return _catalog
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts and lists to read-only equivalents."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _build_tool_catalog() -> Dict[str, Any]:
+    """Describe every tool class, grouped by agent category."""
+    catalog = {}
     
-    for tool_class in ALTERNATIVE_TOOLS:
-        tool = tool_class()
-        catalog["alternative"].append({
-            "name": tool.name,
-            "description": tool.description.strip(),
-            "metadata": tool.metadata.to_dict()
-        })
+    for category, specs in _AGENT_TOOLS.items():
+        entries = []
+        for spec in specs:
+            tool = _instance(spec)
+            entries.append({
+                "name": tool.name,
+                "description": tool.description.strip(),
+                "metadata": tool.tool_metadata.to_dict()
+            })
+        catalog[category] = entries
     
     catalog["summary"] = {
         "total_tools": len(ALL_TOOLS),
         "by_category": {
-            "search": len(SEARCH_TOOLS),
-            "recommendation": len(RECOMMENDATION_TOOLS),
-            "explainability": len(EXPLAINABILITY_TOOLS),
-            "alternative": len(ALTERNATIVE_TOOLS)
+            category: len(specs)
+            for category, specs in _AGENT_TOOLS.items()
         }
     }
     
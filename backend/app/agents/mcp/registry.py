@@ -5,30 +5,56 @@ Manages registration, discovery, and access to MCP tools.
 Provides caching and performance optimization.
 """
 
+import asyncio
+import heapq
 import logging
-from typing import Dict, Any, List, Optional, Type
-from datetime import datetime, timedelta
-from collections import defaultdict
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Set, Tuple, Type
+from collections import OrderedDict, defaultdict
 import hashlib
-import json
+
+import orjson
+
+try:
+    import xxhash
+except ImportError:  # optional; blake2b is used instead
+    xxhash = None
 
 from .protocol import MCPTool, MCPToolMetadata, MCPError, MCPErrorCode
 
 logger = logging.getLogger(__name__)
 
 
+def _key_default(value: Any) -> Any:
+    """
+    Serialize values orjson doesn't handle natively for cache keys.
+    
+    Sets are sorted so equal params give the same key in every process
+    (set iteration order depends on the per-process hash seed).
+    """
+    if isinstance(value, (set, frozenset)):
+        try:
+            return sorted(value)
+        except TypeError:  # mixed element types
+            return sorted(value, key=repr)
+    return str(value)
+
+
 class CacheEntry:
     """Cache entry with TTL support."""
     
-    def __init__(self, data: Any, ttl_seconds: int):
+    def __init__(self, data: Any, ttl_seconds: int, tool_name: Optional[str] = None):
         self.data = data
-        self.created_at = datetime.utcnow()
-        self.ttl = timedelta(seconds=ttl_seconds)
+        self.tool_name = tool_name
+        self.expires_at = time.monotonic() + ttl_seconds
         self.hit_count = 0
     
     @property
     def is_expired(self) -> bool:
-        return datetime.utcnow() > self.created_at + self.ttl
+        return time.monotonic() > self.expires_at
     
     def hit(self) -> Any:
         """Record a cache hit and return data."""
@@ -47,69 +73,116 @@ class MCPToolCache:
     """
     
     def __init__(self, max_size: int = 1000):
-        self._cache: Dict[str, CacheEntry] = {}
+        # Least recently used first
+        self._cache: OrderedDict[bytes, CacheEntry] = OrderedDict()
+        # Keys per tool, so invalidating one tool doesn't scan the cache
+        self._by_tool: Dict[str, Set[bytes]] = defaultdict(set)
+        # (expires_at, key) min-heap; may hold keys since replaced or removed
+        self._expiry_heap: List[Tuple[float, bytes]] = []
         self._max_size = max_size
         self._hits = 0
         self._misses = 0
+        # Batches run tools from worker threads
+        self._lock = threading.Lock()
     
-    def _make_key(self, tool_name: str, params: Dict) -> str:
+    def _make_key(self, tool_name: str, params: Dict) -> bytes:
         """Create cache key from tool name and parameters."""
-        param_str = json.dumps(params, sort_keys=True, default=str)
-        hash_str = hashlib.md5(f"{tool_name}:{param_str}".encode()).hexdigest()
-        return f"{tool_name}:{hash_str}"
+        payload = orjson.dumps(
+            params,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            default=_key_default
+        )
+        if xxhash is not None:
+            return xxhash.xxh3_128_digest(tool_name.encode() + b"\0" + payload)
+        
+        key = hashlib.blake2b(tool_name.encode(), digest_size=16)
+        key.update(b"\0")
+        key.update(payload)
+        return key.digest()
     
-    def get(self, tool_name: str, params: Dict) -> Optional[Any]:
+    def _remove(self, key: bytes):
+        """Drop an entry and its per-tool index reference."""
+        entry = self._cache.pop(key)
+        keys = self._by_tool.get(entry.tool_name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_tool[entry.tool_name]
+    
+    def get(
+        self,
+        tool_name: str,
+        params: Dict,
+        key: Optional[bytes] = None
+    ) -> Optional[Any]:
         """Get cached result if available and not expired."""
-        key = self._make_key(tool_name, params)
-        entry = self._cache.get(key)
-        
-        if entry is None:
-            self._misses += 1
-            return None
-        
-        if entry.is_expired:
-            del self._cache[key]
-            self._misses += 1
-            return None
+        if key is None:
+            key = self._make_key(tool_name, params)
         
-        self._hits += 1
-        return entry.hit()
+        with self._lock:
+            entry = self._cache.get(key)
+            
+            if entry is None:
+                self._misses += 1
+                return None
+            
+            if entry.is_expired:
+                self._remove(key)
+                self._misses += 1
+                return None
+            
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return entry.hit()
     
-    def set(self, tool_name: str, params: Dict, data: Any, ttl_seconds: int):
+    def set(
+        self,
+        tool_name: str,
+        params: Dict,
+        data: Any,
+        ttl_seconds: int,
+        key: Optional[bytes] = None
+    ):
         """Cache a result with TTL."""
-        # Evict if at max size
-        if len(self._cache) >= self._max_size:
-            self._evict_oldest()
+        if key is None:
+            key = self._make_key(tool_name, params)
         
-        key = self._make_key(tool_name, params)
-        self._cache[key] = CacheEntry(data, ttl_seconds)
+        with self._lock:
+            # Expired entries go first, so live ones aren't evicted for room
+            self._sweep_expired()
+            
+            # Evict the least recently used entry if at max size
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            elif len(self._cache) >= self._max_size:
+                self._remove(next(iter(self._cache)))
+            
+            entry = CacheEntry(data, ttl_seconds, tool_name)
+            self._cache[key] = entry
+            self._by_tool[tool_name].add(key)
+            heapq.heappush(self._expiry_heap, (entry.expires_at, key))
     
-    def _evict_oldest(self):
-        """Evict oldest entries (simple LRU approximation)."""
-        if not self._cache:
-            return
-        
-        # Remove 10% of oldest entries
-        entries = sorted(
-            self._cache.items(),
-            key=lambda x: x[1].created_at
-        )
-        
-        to_remove = max(1, len(entries) // 10)
-        for key, _ in entries[:to_remove]:
-            del self._cache[key]
+    def _sweep_expired(self):
+        """Drop entries whose TTL has passed, earliest expiry first."""
+        now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # Skip heap items for keys re-set or removed since
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
     
     def invalidate(self, tool_name: Optional[str] = None):
         """Invalidate cache entries."""
-        if tool_name is None:
-            self._cache.clear()
-        else:
-            keys_to_remove = [
-                k for k in self._cache.keys() 
-                if k.startswith(f"{tool_name}:")
-            ]
-            for key in keys_to_remove:
-                del self._cache[key]
+        with self._lock:
+            if tool_name is None:
+                self._cache.clear()
+                self._by_tool.clear()
+                self._expiry_heap.clear()
+            else:
+                for key in self._by_tool.pop(tool_name, ()):
+                    del self._cache[key]
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -137,8 +210,19 @@ class MCPToolRegistry:
     def __init__(self, cache_size: int = 1000):
         self._tools: Dict[str, MCPTool] = {}
         self._categories: Dict[str, List[str]] = defaultdict(list)
+        # Resolved tools per category, dropped on (un)registration
+        self._category_cache: Dict[str, Tuple[MCPTool, ...]] = {}
+        # JSON schema of each tool's args, built once at registration
+        self._schemas: Dict[str, Optional[Dict[str, Any]]] = {}
         self._cache = MCPToolCache(max_size=cache_size)
         self._initialized = False
+        
+        # Executions in progress by cache key, so identical concurrent
+        # calls share one run. Async futures are loop-bound, hence one
+        # dict per event loop.
+        self._inflight: Dict[bytes, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._ainflight: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
     
     def register(self, tool: MCPTool):
         """Register a tool with the registry."""
@@ -148,9 +232,11 @@ class MCPToolRegistry:
             logger.warning(f"Tool '{name}' already registered, replacing")
         
         self._tools[name] = tool
+        self._category_cache.clear()
+        self._schemas[name] = tool.args_schema.model_json_schema() if tool.args_schema else None
         
         # Add to category
-        category = tool.metadata.category
+        category = tool.tool_metadata.category
         if name not in self._categories[category]:
             self._categories[category].append(name)
         
@@ -160,7 +246,9 @@ class MCPToolRegistry:
         """Remove a tool from the registry."""
         if name in self._tools:
             tool = self._tools.pop(name)
-            category = tool.metadata.category
+            self._category_cache.clear()
+            self._schemas.pop(name, None)
+            category = tool.tool_metadata.category
             if name in self._categories[category]:
                 self._categories[category].remove(name)
             self._cache.invalidate(name)
@@ -170,10 +258,14 @@ class MCPToolRegistry:
         """Get a tool by name."""
         return self._tools.get(name)
     
-    def get_by_category(self, category: str) -> List[MCPTool]:
+    def get_by_category(self, category: str) -> Tuple[MCPTool, ...]:
         """Get all tools in a category."""
-        tool_names = self._categories.get(category, [])
-        return [self._tools[name] for name in tool_names if name in self._tools]
+        tools = self._category_cache.get(category)
+        if tools is None:
+            tool_names = self._categories.get(category, [])
+            tools = tuple(self._tools[name] for name in tool_names if name in self._tools)
+            self._category_cache[category] = tools
+        return tools
     
     def list_tools(self) -> List[str]:
         """List all registered tool names."""
@@ -205,35 +297,41 @@ class MCPToolRegistry:
             return {
                 "success": False,
                 "error": {
-                    "code": MCPErrorCode.RESOURCE_NOT_FOUND.value,
+                    "code": MCPErrorCode.RESOURCE_NOT_FOUND,
                     "message": f"Tool '{tool_name}' not found"
                 }
             }
         
-        # Check cache
-        if use_cache and tool.metadata.cacheable:
-            cached = self._cache.get(tool_name, params)
-            if cached is not None:
-                cached["metadata"]["cache_hit"] = True
-                return cached
+        if not (use_cache and tool.tool_metadata.cacheable):
+            return tool._run(**params)
         
-        # Execute tool
-        result = tool._run(**params)
+        # Check cache
+        key = self._cache._make_key(tool_name, params)
+        cached = self._cache.get(tool_name, params, key=key)
+        if cached is not None:
+            return cached
         
-        # Cache result if successful and cacheable
-        if (
-            use_cache and 
-            tool.metadata.cacheable and 
-            result.get("success", False)
-        ):
-            self._cache.set(
-                tool_name,
-                params,
-                result,
-                tool.metadata.cache_ttl_seconds
-            )
+        # Join an identical execution already in progress
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                future = self._inflight[key] = Future()
+        if pending is not None:
+            return pending.result()
         
-        return result
+        try:
+            # Execute tool
+            result = tool._run(**params)
+            
+            self._cache_result(tool_name, tool, params, result, key)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
     
     async def execute_async(
         self,
@@ -247,35 +345,79 @@ class MCPToolRegistry:
             return {
                 "success": False,
                 "error": {
-                    "code": MCPErrorCode.RESOURCE_NOT_FOUND.value,
+                    "code": MCPErrorCode.RESOURCE_NOT_FOUND,
                     "message": f"Tool '{tool_name}' not found"
                 }
             }
         
+        if not (use_cache and tool.tool_metadata.cacheable):
+            return await tool._arun(**params)
+        
         # Check cache
-        if use_cache and tool.metadata.cacheable:
-            cached = self._cache.get(tool_name, params)
-            if cached is not None:
-                cached["metadata"]["cache_hit"] = True
-                return cached
+        key = self._cache._make_key(tool_name, params)
+        cached = self._cache.get(tool_name, params, key=key)
+        if cached is not None:
+            return cached
+        
+        # Join an identical execution already in progress. It runs in
+        # its own task, so cancelling one caller never cancels the others.
+        loop = asyncio.get_running_loop()
+        inflight = self._ainflight.setdefault(loop, {})
+        task = inflight.get(key)
+        if task is None:
+            task = loop.create_task(self._execute_and_cache(tool_name, tool, params, key))
+            inflight[key] = task
+            
+            def _done(finished: asyncio.Task):
+                del inflight[key]
+                # Callers, if any, re-raise it; don't warn when there are none
+                if not finished.cancelled():
+                    finished.exception()
+            
+            task.add_done_callback(_done)
         
-        # Execute tool
+        return await asyncio.shield(task)
+    
+    async def _execute_and_cache(
+        self,
+        tool_name: str,
+        tool: MCPTool,
+        params: Dict[str, Any],
+        key: bytes
+    ) -> Dict[str, Any]:
+        """Run a cacheable tool once and cache its result."""
         result = await tool._arun(**params)
+        self._cache_result(tool_name, tool, params, result, key)
+        return result
+    
+    def _cache_result(
+        self,
+        tool_name: str,
+        tool: MCPTool,
+        params: Dict[str, Any],
+        result: Dict[str, Any],
+        key: bytes
+    ):
+        """
+        Cache a successful result, already marked as a cache hit.
         
-        # Cache result
-        if (
-            use_cache and 
-            tool.metadata.cacheable and 
-            result.get("success", False)
-        ):
-            self._cache.set(
-                tool_name,
-                params,
-                result,
-                tool.metadata.cache_ttl_seconds
-            )
+        The stored copy is returned as-is on every hit, so hits never
+        mutate it; the caller's own result keeps cache_hit False.
+        """
+        if not result.get("success", False):
+            return
         
-        return result
+        cached = {
+            **result,
+            "metadata": {**result.get("metadata", {}), "cache_hit": True}
+        }
+        self._cache.set(
+            tool_name,
+            params,
+            cached,
+            tool.tool_metadata.cache_ttl_seconds,
+            key=key
+        )
     
     def execute_batch(
         self,
@@ -284,24 +426,53 @@ class MCPToolRegistry:
         """
         Execute multiple tools in batch.
         
+        Requests run concurrently on a thread pool, so I/O-bound tools
+        (Qdrant, LLM) overlap; results keep the request order.
+        
         Each request should have:
         - tool_name: str
         - params: Dict
         - use_cache: bool (optional)
         """
-        results = []
-        for request in requests:
-            tool_name = request.get("tool_name")
-            params = request.get("params", {})
-            use_cache = request.get("use_cache", True)
-            
-            result = self.execute(tool_name, params, use_cache)
-            results.append({
-                "tool_name": tool_name,
-                "result": result
-            })
+        if not requests:
+            return []
         
-        return results
+        with ThreadPoolExecutor(
+            max_workers=min(32, len(requests)),
+            thread_name_prefix="mcp-batch"
+        ) as pool:
+            return list(pool.map(self._execute_request, requests))
+    
+    async def execute_batch_async(
+        self,
+        requests: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Async version of execute_batch(), gathering execute_async() calls."""
+        results = await asyncio.gather(*(
+            self.execute_async(
+                request.get("tool_name"),
+                request.get("params", {}),
+                request.get("use_cache", True)
+            )
+            for request in requests
+        ))
+        return [
+            {"tool_name": request.get("tool_name"), "result": result}
+            for request, result in zip(requests, results)
+        ]
+    
+    def _execute_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one execute_batch() request."""
+        tool_name = request.get("tool_name")
+        result = self.execute(
+            tool_name,
+            request.get("params", {}),
+            request.get("use_cache", True)
+        )
+        return {
+            "tool_name": tool_name,
+            "result": result
+        }
     
     def get_all_stats(self) -> Dict[str, Any]:
         """Get statistics for all tools."""
@@ -324,9 +495,9 @@ class MCPToolRegistry:
         return {
             "name": tool.name,
             "description": tool.description,
-            "metadata": tool.metadata.to_dict(),
+            "metadata": tool.tool_metadata.to_dict(),
             "stats": tool.get_stats(),
-            "args_schema": tool.args_schema.schema() if tool.args_schema else None
+            "args_schema": self._schemas.get(name)
         }
 
 
@@ -19,23 +19,9 @@ from ..registration import (
 )
 
 # Tool imports
-from ..tools.search_tools import (
-    QdrantSemanticSearchTool,
-    ApplyFinancialFiltersTool,
-    InterpretVagueQueryTool
-)
-from ..tools.recommendation_tools import (
-    CalculateAffordabilityMatchTool,
-    RankProductsByConstraintsTool
-)
-from ..tools.explainability_tools import (
-    GetSimilarityExplanationTool,
-    GetFinancialFitExplanationTool
-)
-from ..tools.alternative_tools import (
-    FindSimilarInPriceRangeTool,
-    GetDowngradeOptionsTool
-)
+from ..tools.search_tools import QdrantSemanticSearchTool
+from ..tools.explainability_tools import GetSimilarityExplanationTool
+from ..tools.alternative_tools import FindSimilarInPriceRangeTool
 
 
 # ========================================
@@ -68,6 +54,11 @@ class TestMCPError:
         assert result["code"] == "VECTOR_SEARCH_FAILED"
         assert result["message"] == "Search failed"
         assert result["details"]["query"] == "test"
+        assert str(error) == "[VECTOR_SEARCH_FAILED] Search failed"
+        
+        # Each call returns its own dict
+        result["message"] = "changed"
+        assert error.to_dict()["message"] == "Search failed"
 
 
 class TestMCPToolOutput:
@@ -106,6 +97,15 @@ class TestMCPToolOutput:
         assert result["success"] is True
         assert result["data"]["test"] == "value"
         assert result["metadata"]["cache_hit"] is True
+    
+    def test_success_dict_matches_to_dict(self):
+        """Test the direct success dict equals a serialized success response."""
+        expected = MCPToolOutput.success_response(
+            data={"test": "value"},
+            execution_time_ms=12.5
+        ).to_dict()
+        
+        assert MCPToolOutput.success_dict({"test": "value"}, 12.5) == expected
 
 
 class TestMCPToolMetadata:
@@ -170,53 +170,214 @@ class TestMCPToolCache:
         stats = cache.get_stats()
         assert stats["hits"] == 1
         assert stats["misses"] == 1
+    
+    def test_cache_key_without_xxhash(self):
+        """Test keys fall back to blake2b when xxhash is unavailable."""
+        cache = MCPToolCache()
+        
+        with patch('app.agents.mcp.registry.xxhash', None):
+            key = cache._make_key("tool", {"p": 1})
+            cache.set("tool", {"p": 1}, {"r": 1}, 300)
+            
+            assert len(key) == 16
+            assert key != cache._make_key("other", {"p": 1})
+            assert cache.get("tool", {"p": 1}) == {"r": 1}
+    
+    def test_cache_key_independent_of_set_order(self):
+        """Test set params are keyed by their sorted elements, not hash order."""
+        cache = MCPToolCache()
+        ids = {f"p{i}" for i in range(20)}
+        
+        key = cache._make_key("tool", {"exclude_ids": ids})
+        
+        assert key == cache._make_key("tool", {"exclude_ids": sorted(ids)})
+        assert key == cache._make_key("tool", {"exclude_ids": frozenset(reversed(sorted(ids)))})
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test a full cache evicts the entry read least recently."""
+        cache = MCPToolCache(max_size=2)
+        
+        cache.set("tool", {"p": 1}, {"r": 1}, 300)
+        cache.set("tool", {"p": 2}, {"r": 2}, 300)
+        cache.get("tool", {"p": 1})
+        cache.set("tool", {"p": 3}, {"r": 3}, 300)
+        
+        assert cache.get("tool", {"p": 1}) == {"r": 1}
+        assert cache.get("tool", {"p": 2}) is None
+        assert cache.get("tool", {"p": 3}) == {"r": 3}
+    
+    def test_cache_set_sweeps_expired_entries(self):
+        """Test expired entries are dropped on set instead of evicting live ones."""
+        cache = MCPToolCache(max_size=2)
+        
+        cache.set("tool", {"p": 1}, {"r": 1}, 0)
+        cache.set("tool", {"p": 2}, {"r": 2}, 300)
+        cache.set("tool", {"p": 3}, {"r": 3}, 300)
+        
+        assert cache.get_stats()["size"] == 2
+        assert cache.get("tool", {"p": 2}) == {"r": 2}
+        assert cache.get("tool", {"p": 3}) == {"r": 3}
+    
+    def test_cache_invalidate_tool(self):
+        """Test invalidating one tool keeps other tools' entries."""
+        cache = MCPToolCache()
+        
+        cache.set("tool1", {"p": 1}, {"r": 1}, 300)
+        cache.set("tool1", {"p": 2}, {"r": 2}, 300)
+        cache.set("tool2", {"p": 1}, {"r": 3}, 300)
+        cache.invalidate("tool1")
+        
+        assert cache.get("tool1", {"p": 1}) is None
+        assert cache.get("tool1", {"p": 2}) is None
+        assert cache.get("tool2", {"p": 1}) == {"r": 3}
 
 
 class TestMCPToolRegistry:
     """Tests for MCPToolRegistry."""
     
-    def test_register_tool(self):
+    def test_register_tool(self, filter_tool):
         """Test tool registration."""
         registry = MCPToolRegistry()
         
-        tool = ApplyFinancialFiltersTool()
-        registry.register(tool)
+        registry.register(filter_tool)
         
-        assert tool.name in registry.list_tools()
+        assert filter_tool.name in registry.list_tools()
     
-    def test_get_tool(self):
+    def test_get_tool(self, filter_tool):
         """Test getting registered tool."""
         registry = MCPToolRegistry()
         
-        tool = ApplyFinancialFiltersTool()
-        registry.register(tool)
+        registry.register(filter_tool)
         
-        retrieved = registry.get(tool.name)
+        retrieved = registry.get(filter_tool.name)
         assert retrieved is not None
-        assert retrieved.name == tool.name
+        assert retrieved.name == filter_tool.name
     
-    def test_get_by_category(self):
+    def test_get_by_category(self, filter_tool, vague_query_tool):
         """Test getting tools by category."""
         registry = MCPToolRegistry()
         
-        tool1 = ApplyFinancialFiltersTool()
-        tool2 = InterpretVagueQueryTool()
-        
-        registry.register(tool1)
-        registry.register(tool2)
+        registry.register(filter_tool)
+        registry.register(vague_query_tool)
         
         search_tools = registry.get_by_category("search")
         assert len(search_tools) == 2
     
-    def test_unregister_tool(self):
+    def test_unregister_tool(self, filter_tool):
         """Test tool unregistration."""
         registry = MCPToolRegistry()
         
-        tool = ApplyFinancialFiltersTool()
-        registry.register(tool)
-        registry.unregister(tool.name)
+        registry.register(filter_tool)
+        registry.unregister(filter_tool.name)
+        
+        assert filter_tool.name not in registry.list_tools()
+    
+    def test_execute_batch_runs_concurrently(self):
+        """Test batch requests overlap and keep their order."""
+        import threading
+        
+        registry = MCPToolRegistry()
+        tool = MagicMock()
+        tool.tool_metadata.cacheable = False
+        # Only passes once all five requests are running at the same time
+        barrier = threading.Barrier(5, timeout=5)
+        
+        def slow_run(**params):
+            barrier.wait()
+            return {"success": True, "data": params["n"]}
+        
+        tool._run.side_effect = slow_run
+        registry._tools["slow"] = tool
+        
+        results = registry.execute_batch([
+            {"tool_name": "slow", "params": {"n": n}} for n in range(5)
+        ])
+        
+        assert [r["result"]["data"] for r in results] == list(range(5))
+    
+    def test_execute_coalesces_identical_calls(self):
+        """Test concurrent identical cacheable calls share one execution."""
+        import time
+        
+        registry = MCPToolRegistry()
+        tool = MagicMock()
+        tool.tool_metadata.cacheable = True
+        tool.tool_metadata.cache_ttl_seconds = 300
+        
+        def slow_run(**params):
+            time.sleep(0.1)
+            return {"success": True, "metadata": {}, "data": params}
+        
+        tool._run.side_effect = slow_run
+        registry._tools["slow"] = tool
         
-        assert tool.name not in registry.list_tools()
+        results = registry.execute_batch([
+            {"tool_name": "slow", "params": {"q": "laptop"}} for _ in range(4)
+        ])
+        
+        assert tool._run.call_count == 1
+        assert all(r["result"]["data"] == {"q": "laptop"} for r in results)
+    
+    def test_execute_async_cancelled_caller_does_not_cancel_joiners(self):
+        """Test cancelling the first caller leaves the shared execution running."""
+        import asyncio
+        
+        registry = MCPToolRegistry()
+        tool = MagicMock()
+        tool.tool_metadata.cacheable = True
+        tool.tool_metadata.cache_ttl_seconds = 300
+        
+        async def slow_arun(**params):
+            await asyncio.sleep(0.05)
+            return {"success": True, "metadata": {}, "data": params}
+        
+        tool._arun.side_effect = slow_arun
+        registry._tools["slow"] = tool
+        
+        async def scenario():
+            first = asyncio.create_task(registry.execute_async("slow", {"q": "tv"}))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(registry.execute_async("slow", {"q": "tv"}))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second, first.cancelled()
+        
+        result, first_cancelled = asyncio.run(scenario())
+        
+        assert first_cancelled
+        assert result["data"] == {"q": "tv"}
+        assert tool._arun.call_count == 1
+    
+    def test_execute_cache_hit_is_marked_without_mutation(self):
+        """Test cache hits are flagged while the first result is left as run."""
+        registry = MCPToolRegistry()
+        tool = MagicMock()
+        tool.tool_metadata.cacheable = True
+        tool.tool_metadata.cache_ttl_seconds = 300
+        tool._run.return_value = {
+            "success": True,
+            "metadata": {"cache_hit": False},
+            "data": 1
+        }
+        registry._tools["tool"] = tool
+        
+        first = registry.execute("tool", {"p": 1})
+        second = registry.execute("tool", {"p": 1})
+        
+        assert first["metadata"]["cache_hit"] is False
+        assert second["metadata"]["cache_hit"] is True
+        assert registry.execute("tool", {"p": 1}) is second
+        assert tool._run.call_count == 1
+    
+    def test_get_tool_info_schema(self, filter_tool):
+        """Test tool info reuses the args schema built at registration."""
+        registry = MCPToolRegistry()
+        
+        registry.register(filter_tool)
+        
+        info = registry.get_tool_info(filter_tool.name)
+        assert info["args_schema"] == filter_tool.args_schema.model_json_schema()
+        assert registry.get_tool_info(filter_tool.name)["args_schema"] is info["args_schema"]
 
 
 # ========================================
@@ -226,19 +387,23 @@ class TestMCPToolRegistry:
 class TestToolRegistration:
     """Tests for tool registration functions."""
     
-    def test_get_tools_for_agent(self):
+    @pytest.mark.parametrize("agent_type,expected", [
+        ("search", 5),
+        ("recommendation", 5),
+        ("explainability", 4),
+        ("alternative", 4),
+    ])
+    def test_get_tools_for_agent(self, agent_type, expected):
         """Test getting tools for specific agent."""
-        search_tools = get_tools_for_agent("search")
-        assert len(search_tools) == 5
-        
-        rec_tools = get_tools_for_agent("recommendation")
-        assert len(rec_tools) == 5
-        
-        exp_tools = get_tools_for_agent("explainability")
-        assert len(exp_tools) == 4
-        
+        assert len(get_tools_for_agent(agent_type)) == expected
+    
+    def test_get_tools_for_agent_shares_instances(self):
+        """Test repeated lookups return the same tool instances."""
         alt_tools = get_tools_for_agent("alternative")
-        assert len(alt_tools) == 4
+        
+        assert all(
+            a is b for a, b in zip(get_tools_for_agent("alternative"), alt_tools)
+        )
     
     def test_get_tool_catalog(self):
         """Test getting tool catalog."""
@@ -248,6 +413,26 @@ class TestToolRegistration:
         assert "recommendation" in catalog
         assert "summary" in catalog
         assert catalog["summary"]["total_tools"] == 18
+        assert get_tool_catalog() is catalog
+        
+        # Shared between callers, so it cannot be modified
+        with pytest.raises(TypeError):
+            catalog["search"] = []
+        with pytest.raises(TypeError):
+            catalog["summary"]["by_category"]["search"] = 0
+        with pytest.raises(AttributeError):
+            catalog["search"].append({})
+    
+    def test_package_exports_resolve_lazily(self):
+        """Test tool and registration names load on first package access."""
+        from ... import mcp
+        from .. import registration
+        
+        assert mcp.get_tool_catalog is registration.get_tool_catalog
+        assert mcp.QdrantSemanticSearchTool is QdrantSemanticSearchTool
+        assert set(mcp.__all__) <= set(dir(mcp))
+        with pytest.raises(AttributeError):
+            mcp.NotATool
 
 
 # ========================================
@@ -257,17 +442,15 @@ class TestToolRegistration:
 class TestApplyFinancialFiltersTool:
     """Tests for ApplyFinancialFiltersTool."""
     
-    def test_filter_by_budget(self):
+    def test_filter_by_budget(self, filter_tool):
         """Test filtering products by budget."""
-        tool = ApplyFinancialFiltersTool()
-        
         products = [
             {"id": "1", "name": "Product A", "price": 100},
             {"id": "2", "name": "Product B", "price": 200},
             {"id": "3", "name": "Product C", "price": 300}
         ]
         
-        result = tool._execute(
+        result = filter_tool._execute(
             products=products,
             budget_max=250
         )
@@ -277,11 +460,9 @@ class TestApplyFinancialFiltersTool:
         assert len(filtered) == 2
         assert all(p["price"] <= 250 for p in filtered)
     
-    def test_empty_products(self):
+    def test_empty_products(self, filter_tool):
         """Test with empty product list."""
-        tool = ApplyFinancialFiltersTool()
-        
-        result = tool._execute(products=[], budget_max=100)
+        result = filter_tool._execute(products=[], budget_max=100)
         
         assert result.success is True
         assert result.data["filtered_count"] == 0
@@ -290,30 +471,24 @@ class TestApplyFinancialFiltersTool:
 class TestInterpretVagueQueryTool:
     """Tests for InterpretVagueQueryTool."""
     
-    def test_detect_budget_intent(self):
+    def test_detect_budget_intent(self, vague_query_tool):
         """Test detecting budget intent."""
-        tool = InterpretVagueQueryTool()
-        
-        result = tool._execute(query="cheap laptop under $500")
+        result = vague_query_tool._execute(query="cheap laptop under $500")
         
         assert result.success is True
         data = result.data
         assert "budget" in data["interpreted"]["intents"]
         assert data["interpreted"]["budget"] == 500
     
-    def test_detect_category(self):
+    def test_detect_category(self, vague_query_tool):
         """Test detecting category from query."""
-        tool = InterpretVagueQueryTool()
-        
-        result = tool._execute(query="looking for a new smartphone")
+        result = vague_query_tool._execute(query="looking for a new smartphone")
         
         assert result.success is True
         assert "electronics" in result.data["interpreted"]["categories"]
     
-    def test_extract_price(self):
+    def test_extract_price(self, vague_query_tool):
         """Test price extraction patterns."""
-        tool = InterpretVagueQueryTool()
-        
         queries_and_prices = [
             ("under $1000", 1000),
             ("less than $500", 500),
@@ -321,7 +496,7 @@ class TestInterpretVagueQueryTool:
         ]
         
         for query, expected in queries_and_prices:
-            result = tool._execute(query=query)
+            result = vague_query_tool._execute(query=query)
             assert result.data["interpreted"]["budget"] == expected
 
 
@@ -332,10 +507,8 @@ class TestInterpretVagueQueryTool:
 class TestCalculateAffordabilityMatchTool:
     """Tests for CalculateAffordabilityMatchTool."""
     
-    def test_calculate_affordability(self):
+    def test_calculate_affordability(self, affordability_tool):
         """Test affordability calculation."""
-        tool = CalculateAffordabilityMatchTool()
-        
         products = [
             {"id": "1", "price": 100},
             {"id": "2", "price": 500},
@@ -349,7 +522,7 @@ class TestCalculateAffordabilityMatchTool:
             }
         }
         
-        result = tool._execute(products=products, user_profile=user_profile)
+        result = affordability_tool._execute(products=products, user_profile=user_profile)
         
         assert result.success is True
         scored = result.data["scored_products"]
@@ -365,30 +538,26 @@ class TestCalculateAffordabilityMatchTool:
 class TestRankProductsByConstraintsTool:
     """Tests for RankProductsByConstraintsTool."""
     
-    def test_ranking(self):
+    def test_ranking(self, ranking_tool):
         """Test multi-factor ranking."""
-        tool = RankProductsByConstraintsTool()
-        
         products = [
             {"id": "1", "score": 0.9, "affordability_score": 0.5, "rating": 4.0},
             {"id": "2", "score": 0.7, "affordability_score": 0.9, "rating": 4.5},
             {"id": "3", "score": 0.8, "affordability_score": 0.7, "rating": 3.5}
         ]
         
-        result = tool._execute(products=products)
+        result = ranking_tool._execute(products=products)
         
         assert result.success is True
         ranked = result.data["ranked_products"]
         assert len(ranked) == 3
         assert all("ranking_score" in p for p in ranked)
     
-    def test_custom_weights(self):
+    def test_custom_weights(self, ranking_tool):
         """Test with custom weights."""
-        tool = RankProductsByConstraintsTool()
-        
         products = [{"id": "1", "score": 0.5, "affordability_score": 0.9}]
         
-        result = tool._execute(
+        result = ranking_tool._execute(
             products=products,
             weights={"relevance": 0.1, "affordability": 0.9}
         )
@@ -404,10 +573,8 @@ class TestRankProductsByConstraintsTool:
 class TestGetFinancialFitExplanationTool:
     """Tests for GetFinancialFitExplanationTool."""
     
-    def test_explain_within_budget(self):
+    def test_explain_within_budget(self, financial_fit_tool):
         """Test explanation for product within budget."""
-        tool = GetFinancialFitExplanationTool()
-        
         product = {"id": "1", "price": 200, "rating": 4.5}
         user_profile = {
             "financial": {
@@ -417,22 +584,20 @@ class TestGetFinancialFitExplanationTool:
             }
         }
         
-        result = tool._execute(product=product, user_profile=user_profile)
+        result = financial_fit_tool._execute(product=product, user_profile=user_profile)
         
         assert result.success is True
         assert result.data["fit_level"] in ["excellent", "good"]
         assert result.data["analysis"]["budget_analysis"]["within_budget"] is True
     
-    def test_explain_over_budget(self):
+    def test_explain_over_budget(self, financial_fit_tool):
         """Test explanation for product over budget."""
-        tool = GetFinancialFitExplanationTool()
-        
         product = {"id": "1", "price": 800}
         user_profile = {
             "financial": {"budget_max": 500}
         }
         
-        result = tool._execute(product=product, user_profile=user_profile)
+        result = financial_fit_tool._execute(product=product, user_profile=user_profile)
         
         assert result.success is True
         assert result.data["fit_level"] in ["stretch", "poor"]
@@ -445,13 +610,11 @@ class TestGetFinancialFitExplanationTool:
 class TestGetDowngradeOptionsTool:
     """Tests for GetDowngradeOptionsTool."""
     
-    def test_max_price_higher_than_original(self):
+    def test_max_price_higher_than_original(self, downgrade_tool):
         """Test when max_price exceeds original price."""
-        tool = GetDowngradeOptionsTool()
-        
         product = {"id": "1", "price": 500}
         
-        result = tool._execute(product=product, max_price=600)
+        result = downgrade_tool._execute(product=product, max_price=600)
         
         assert result.success is True
         assert "consider find_similar_in_price_range" in result.data["message"]
@@ -466,15 +629,13 @@ class TestMockedQdrantIntegration:
     
     @patch('app.agents.services.qdrant_service.QdrantService.semantic_search')
     @patch('app.agents.services.embedding_service.EmbeddingService.embed')
-    def test_semantic_search_tool(self, mock_embed, mock_search):
+    def test_semantic_search_tool(self, mock_embed, mock_search, semantic_search_tool):
         """Test semantic search with mocked services."""
         mock_embed.return_value = [0.1] * 384
         mock_search.return_value = [
             {"id": "1", "score": 0.9, "payload": {"name": "Test Product", "price": 100}}
         ]
         
-        tool = QdrantSemanticSearchTool()
-        
         # This would use the mocked services
         # In a real test, you'd verify the tool calls the services correctly
 
@@ -482,11 +643,9 @@ class TestMockedQdrantIntegration:
 class TestEdgeCases:
     """Tests for edge cases and error handling."""
     
-    def test_empty_products_list(self):
+    def test_empty_products_list(self, affordability_tool):
         """Test tools with empty product lists."""
-        tool = CalculateAffordabilityMatchTool()
-        
-        result = tool._execute(
+        result = affordability_tool._execute(
             products=[],
             user_profile={"financial": {"budget_max": 100}}
         )
@@ -494,24 +653,29 @@ class TestEdgeCases:
         assert result.success is True
         assert result.data["scored_products"] == []
     
-    def test_missing_price(self):
+    def test_missing_price(self, filter_tool):
         """Test with products missing price."""
-        tool = ApplyFinancialFiltersTool()
-        
         products = [{"id": "1", "name": "No Price Product"}]
-        result = tool._execute(products=products, budget_max=100)
+        result = filter_tool._execute(products=products, budget_max=100)
         
         assert result.success is True
     
-    def test_very_long_query(self):
+    def test_very_long_query(self, vague_query_tool):
         """Test with very long query string."""
-        tool = InterpretVagueQueryTool()
-        
         long_query = "find " + "laptop " * 1000
-        result = tool._execute(query=long_query)
+        result = vague_query_tool._execute(query=long_query)
+        
+        assert result.success is True
+    
+    def test_very_long_query_scan_is_bounded(self, vague_query_tool):
+        """Test that keyword scans stop early but budget uses the full query."""
+        long_query = "find " + "laptop " * 1000 + "sofa under $300"
+        result = vague_query_tool._execute(query=long_query)
         
         assert result.success is True
+        assert result.data["interpreted"]["categories"] == ["electronics"]
+        assert result.data["interpreted"]["budget"] == 300.0
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
+    pytest.main([__file__, "-v", "-p", "no:cacheprovider"])
@@ -0,0 +1,55 @@
+"""
+Shared fixtures for MCP tool tests.
+
+Tools are stateless apart from call statistics, so each one is built
+once per session instead of in every test.
+"""
+
+import pytest
+
+from ..tools.search_tools import (
+    QdrantSemanticSearchTool,
+    ApplyFinancialFiltersTool,
+    InterpretVagueQueryTool
+)
+from ..tools.recommendation_tools import (
+    CalculateAffordabilityMatchTool,
+    RankProductsByConstraintsTool
+)
+from ..tools.explainability_tools import GetFinancialFitExplanationTool
+from ..tools.alternative_tools import GetDowngradeOptionsTool
+
+
+@pytest.fixture(scope="session")
+def semantic_search_tool():
+    return QdrantSemanticSearchTool()
+
+
+@pytest.fixture(scope="session")
+def filter_tool():
+    return ApplyFinancialFiltersTool()
+
+
+@pytest.fixture(scope="session")
+def vague_query_tool():
+    return InterpretVagueQueryTool()
+
+
+@pytest.fixture(scope="session")
+def affordability_tool():
+    return CalculateAffordabilityMatchTool()
+
+
+@pytest.fixture(scope="session")
+def ranking_tool():
+    return RankProductsByConstraintsTool()
+
+
+@pytest.fixture(scope="session")
+def financial_fit_tool():
+    return GetFinancialFitExplanationTool()
+
+
+@pytest.fixture(scope="session")
+def downgrade_tool():
+    return GetDowngradeOptionsTool()
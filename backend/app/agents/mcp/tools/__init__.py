@@ -9,32 +9,46 @@ Each tool follows the Model Context Protocol standards for:
 - Caching support
 """
 
-from .search_tools import (
-    QdrantSemanticSearchTool,
-    ApplyFinancialFiltersTool,
-    InterpretVagueQueryTool,
-    ImageSimilaritySearchTool,
-    VoiceToTextSearchTool
-)
-from .recommendation_tools import (
-    GetUserFinancialProfileTool,
-    GetUserInteractionHistoryTool,
-    CalculateAffordabilityMatchTool,
-    RankProductsByConstraintsTool,
-    GetContextualRecommendationsTool
-)
-from .explainability_tools import (
-    GetSimilarityExplanationTool,
-    GetFinancialFitExplanationTool,
-    GetAttributeMatchesTool,
-    GenerateNaturalExplanationTool
-)
-from .alternative_tools import (
-    FindSimilarInPriceRangeTool,
-    FindCategoryAlternativesTool,
-    GetDowngradeOptionsTool,
-    GetUpgradePathTool
-)
+import importlib
+
+# Each tool module builds its Pydantic schemas and imports the service
+# layer, so modules load on first access (PEP 562) rather than all at
+# once; importing one category doesn't pull in the others.
+_LAZY = {
+    "QdrantSemanticSearchTool": ".search_tools",
+    "ApplyFinancialFiltersTool": ".search_tools",
+    "InterpretVagueQueryTool": ".search_tools",
+    "ImageSimilaritySearchTool": ".search_tools",
+    "VoiceToTextSearchTool": ".search_tools",
+    "GetUserFinancialProfileTool": ".recommendation_tools",
+    "GetUserInteractionHistoryTool": ".recommendation_tools",
+    "CalculateAffordabilityMatchTool": ".recommendation_tools",
+    "RankProductsByConstraintsTool": ".recommendation_tools",
+    "GetContextualRecommendationsTool": ".recommendation_tools",
+    "GetSimilarityExplanationTool": ".explainability_tools",
+    "GetFinancialFitExplanationTool": ".explainability_tools",
+    "GetAttributeMatchesTool": ".explainability_tools",
+    "GenerateNaturalExplanationTool": ".explainability_tools",
+    "FindSimilarInPriceRangeTool": ".alternative_tools",
+    "FindCategoryAlternativesTool": ".alternative_tools",
+    "GetDowngradeOptionsTool": ".alternative_tools",
+    "GetUpgradePathTool": ".alternative_tools",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
+
 
 __all__ = [
     # Search Tools
@@ -505,6 +505,7 @@ class RankProductsByConstraintsTool(MCPTool):
         # Normalize weights
         total_weight = sum(w.values())
         w = {k: v / total_weight for k, v in w.items()}
+        weight_items = tuple(w.items())
         
         embedding_service = get_embedding_service()
         
@@ -513,6 +514,12 @@ class RankProductsByConstraintsTool(MCPTool):
         if query:
             query_embedding = embedding_service.embed(query)
         
+        # Profile preferences are the same for every product
+        prefs = (user_profile or {}).get("preferences", {})
+        pref_cats = prefs.get("preferred_categories", [])
+        pref_brands = prefs.get("preferred_brands", [])
+        quality_pref = prefs.get("quality_preference", "balanced")
+        
         ranked = []
         
         for product in products:
@@ -535,20 +542,15 @@ class RankProductsByConstraintsTool(MCPTool):
             # Preference match
             pref_score = 0.5
             if user_profile:
-                prefs = user_profile.get("preferences", {})
-                
                 # Category match
-                pref_cats = prefs.get("preferred_categories", [])
                 if pref_cats and product.get("category") in pref_cats:
                     pref_score += 0.2
                 
                 # Brand match
-                pref_brands = prefs.get("preferred_brands", [])
                 if pref_brands and product.get("brand") in pref_brands:
                     pref_score += 0.2
                 
                 # Quality preference
-                quality_pref = prefs.get("quality_preference", "balanced")
                 product_tier = product.get("tier", "standard")
                 
                 if quality_pref == "premium" and product_tier == "premium":
@@ -567,7 +569,7 @@ class RankProductsByConstraintsTool(MCPTool):
             scores["quality"] = min(1.0, quality_score)
             
             # Calculate weighted total
-            total_score = sum(scores[k] * w[k] for k in w.keys())
+            total_score = sum(scores[k] * weight for k, weight in weight_items)
             
             ranked.append({
                 **product,
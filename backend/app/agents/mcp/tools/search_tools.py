@@ -8,6 +8,7 @@ import logging
 import re
 from typing import Dict, Any, List, Optional, ClassVar
 
+import numpy as np
 from pydantic import BaseModel, Field
 
 from ..protocol import (
@@ -264,16 +265,27 @@ class ApplyFinancialFiltersTool(MCPTool):
             "financing_filtered": 0
         }
         
-        for product in products:
-            price = product.get("price", 0)
-            
-            # Budget filter
-            if budget_max and price > budget_max:
-                filter_stats["budget_filtered"] += 1
-                continue
-            if budget_min and price < budget_min:
-                filter_stats["budget_filtered"] += 1
-                continue
+        # Budget filter and affordability over all prices at once
+        prices = np.fromiter(
+            (product.get("price", 0) for product in products),
+            dtype=np.float64,
+            count=len(products)
+        )
+        in_budget = np.ones(len(products), dtype=bool)
+        if budget_max:
+            in_budget &= prices <= budget_max
+        if budget_min:
+            in_budget &= prices >= budget_min
+        
+        affordability = np.ones(len(products))
+        if budget_max:
+            np.clip(1 - prices / budget_max, 0, 1, out=affordability, where=prices > 0)
+        
+        kept = np.flatnonzero(in_budget)
+        filter_stats["budget_filtered"] = len(products) - len(kept)
+        
+        for i in kept.tolist():
+            product = products[i]
             
             # Payment method filter
             if payment_methods:
@@ -289,13 +301,7 @@ class ApplyFinancialFiltersTool(MCPTool):
                     filter_stats["financing_filtered"] += 1
                     continue
             
-            # Calculate affordability score
-            affordability = 1.0
-            if budget_max and price > 0:
-                affordability = 1 - (price / budget_max)
-                affordability = max(0, min(1, affordability))
-            
-            product["affordability_score"] = round(affordability, 2)
+            product["affordability_score"] = round(float(affordability[i]), 2)
             product["within_budget"] = True
             filtered.append(product)
         
@@ -352,14 +358,14 @@ class InterpretVagueQueryTool(MCPTool):
         avg_latency_ms=200
     )
     
-    # Intent patterns
-    INTENT_PATTERNS: ClassVar[Dict[str, str]] = {
-        "browse": r"\b(looking|browsing|show|what|see)\b",
-        "compare": r"\b(compare|versus|vs|difference|better)\b",
-        "recommend": r"\b(recommend|suggest|best|top|good)\b",
-        "specific": r"\b(need|want|looking for|find|get)\b",
-        "budget": r"\b(cheap|affordable|budget|under|less than)\b",
-        "quality": r"\b(premium|quality|best|high-end|luxury)\b"
+    # Intent patterns, compiled once
+    INTENT_PATTERNS: ClassVar[Dict[str, re.Pattern]] = {
+        "browse": re.compile(r"\b(looking|browsing|show|what|see)\b"),
+        "compare": re.compile(r"\b(compare|versus|vs|difference|better)\b"),
+        "recommend": re.compile(r"\b(recommend|suggest|best|top|good)\b"),
+        "specific": re.compile(r"\b(need|want|looking for|find|get)\b"),
+        "budget": re.compile(r"\b(cheap|affordable|budget|under|less than)\b"),
+        "quality": re.compile(r"\b(premium|quality|best|high-end|luxury)\b")
     }
     
     # Category keywords
@@ -373,13 +379,16 @@ class InterpretVagueQueryTool(MCPTool):
     
     # Budget extraction patterns
     BUDGET_PATTERNS: ClassVar[List[tuple]] = [
-        (r"\$(\d+(?:,\d{3})*(?:\.\d{2})?)", lambda m: float(m.group(1).replace(",", ""))),
-        (r"under\s+\$?(\d+)", lambda m: float(m.group(1))),
-        (r"less than\s+\$?(\d+)", lambda m: float(m.group(1))),
-        (r"(\d+)\s+(?:dollars|bucks)", lambda m: float(m.group(1))),
-        (r"budget\s+(?:of\s+)?\$?(\d+)", lambda m: float(m.group(1)))
+        (re.compile(r"\$(\d+(?:,\d{3})*(?:\.\d{2})?)"), lambda m: float(m.group(1).replace(",", ""))),
+        (re.compile(r"under\s+\$?(\d+)"), lambda m: float(m.group(1))),
+        (re.compile(r"less than\s+\$?(\d+)"), lambda m: float(m.group(1))),
+        (re.compile(r"(\d+)\s+(?:dollars|bucks)"), lambda m: float(m.group(1))),
+        (re.compile(r"budget\s+(?:of\s+)?\$?(\d+)"), lambda m: float(m.group(1)))
     ]
     
+    # Intent and category signal is taken from the start of the query only
+    MAX_SCAN_CHARS: ClassVar[int] = 512
+    
     def _execute(
         self,
         query: str,
@@ -390,10 +399,15 @@ class InterpretVagueQueryTool(MCPTool):
         
         query_lower = query.lower()
         
+        # Bound the keyword scans, cutting at a word boundary
+        scan_text = query_lower
+        if len(scan_text) > self.MAX_SCAN_CHARS:
+            scan_text = scan_text[:self.MAX_SCAN_CHARS].rsplit(" ", 1)[0]
+        
         # Detect intents
         intents = []
         for intent, pattern in self.INTENT_PATTERNS.items():
-            if re.search(pattern, query_lower):
+            if pattern.search(scan_text):
                 intents.append(intent)
         
         if not intents:
@@ -402,13 +416,13 @@ class InterpretVagueQueryTool(MCPTool):
         # Infer categories
         inferred_categories = []
         for category, keywords in self.CATEGORY_KEYWORDS.items():
-            if any(kw in query_lower for kw in keywords):
+            if any(kw in scan_text for kw in keywords):
                 inferred_categories.append(category)
         
         # Extract budget
         extracted_budget = None
         for pattern, extractor in self.BUDGET_PATTERNS:
-            match = re.search(pattern, query_lower)
+            match = pattern.search(query_lower)
             if match:
                 try:
                     extracted_budget = extractor(match)
@@ -432,9 +446,9 @@ class InterpretVagueQueryTool(MCPTool):
         
         # Quality indicators
         quality_level = "standard"
-        if "budget" in intents or any(w in query_lower for w in ["cheap", "affordable"]):
+        if "budget" in intents or any(w in scan_text for w in ["cheap", "affordable"]):
             quality_level = "budget"
-        elif "quality" in intents or any(w in query_lower for w in ["premium", "best", "luxury"]):
+        elif "quality" in intents or any(w in scan_text for w in ["premium", "best", "luxury"]):
             quality_level = "premium"
         
         # Use conversation history for context
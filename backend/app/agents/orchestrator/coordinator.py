@@ -11,6 +11,7 @@ from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 
 from ..base import BaseAgent, AgentState, ConversationContext, ContextManager, get_context_manager
+from ..base.agent_state import ConversationStage
 from ..config import AgentConfig, AgentType, get_config
 from ..search_agent import SearchAgent
 from ..recommendation_agent import RecommendationAgent
@@ -146,7 +147,7 @@ class AgentOrchestrator:
         
         # Check conversation stage
         if context:
-            if context.stage.value in ["compare", "decide"]:
+            if context.stage in (ConversationStage.COMPARE, ConversationStage.DECIDE):
                 return "ExplainabilityAgent"
             if context.products.recommended_products:
                 return "RecommendationAgent"
@@ -584,7 +585,7 @@ class AgentOrchestrator:
         
         alt_agent: AlternativeAgent = self._agents.get("AlternativeAgent")
         
-        result = alt_agent.get_budget_alternatives(
+        result = await alt_agent.aget_budget_alternatives(
             product=product,
             user_budget=user_budget,
             num_alternatives=num_alternatives
@@ -349,8 +349,8 @@ class WorkflowExecutor:
         )
         
         # Add context data to state
-        if context.get("user_id"):
-            state.user_id = context["user_id"]
+        if context.get("user_id") and state.context and not state.context.user.user_id:
+            state.context.user.user_id = context["user_id"]
         
         # Run agent
         result_state = await agent.run(task, state, conversation_context)
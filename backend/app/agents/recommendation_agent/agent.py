@@ -6,6 +6,7 @@ preferences, and financial context.
 """
 
 import logging
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
 
 from langchain_core.tools import BaseTool
@@ -22,6 +23,9 @@ from .prompts import RECOMMENDATION_AGENT_SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
+# Read-only stand-in for a missing nested dict
+_EMPTY = MappingProxyType({})
+
 
 class RecommendationAgent(BaseAgent):
     """
@@ -161,11 +165,12 @@ class RecommendationAgent(BaseAgent):
             }
         
         user_profile = profile_result['profile']
+        financial = user_profile.get('financial_context') or _EMPTY
         
         # Determine max price
         effective_max_price = max_price
         if not effective_max_price:
-            effective_max_price = user_profile.get('financial_context', {}).get('budget_max')
+            effective_max_price = financial.get('budget_max')
         
         # Get recommendations
         rec_result = recommend_tool._run(
@@ -185,15 +190,16 @@ class RecommendationAgent(BaseAgent):
         recommendations = rec_result.get('recommendations', [])
         
         # Calculate affordability for each
-        budget_max = user_profile.get('financial_context', {}).get('budget_max')
-        monthly_income = user_profile.get('financial_context', {}).get('monthly_budget')
+        budget_max = financial.get('budget_max')
+        monthly_income = financial.get('monthly_budget')
+        risk_tolerance = financial.get('risk_tolerance', 'medium')
         
         for rec in recommendations:
             aff_result = affordability_tool._run(
                 product_price=rec.get('price', 0),
                 user_budget_max=budget_max,
                 user_monthly_income=monthly_income,
-                risk_tolerance=user_profile.get('financial_context', {}).get('risk_tolerance', 'medium')
+                risk_tolerance=risk_tolerance
             )
             rec['affordability'] = {
                 'score': aff_result.get('affordability_score'),
@@ -0,0 +1,118 @@
+"""
+Micro-batching for FinFind services.
+
+Collects concurrent single-item requests for a few milliseconds and
+hands them to a batch handler in one call.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingBatch:
+    """Requests waiting to be flushed on one event loop."""
+
+    __slots__ = ("items", "flush_handle", "tasks")
+
+    def __init__(self):
+        self.items: List[Tuple[Any, asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.tasks: Set[asyncio.Task] = set()
+
+
+class MicroBatcher:
+    """
+    Micro-batcher in front of a synchronous batch handler.
+
+    A batch is flushed once ``max_batch_size`` requests are pending or
+    ``max_wait_ms`` after the first request arrived, whichever is first.
+    Pending requests are kept per event loop and every batch runs on the
+    loop that submitted it, so one batcher can be shared by the API
+    server and by any number of threads each running ``asyncio.run``.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: int = 5,
+        name: str = "micro"
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            handler: Called in a worker thread with the batched items;
+                must return one result per item, in the same order.
+            max_batch_size: Flush as soon as this many requests are pending.
+            max_wait_ms: Maximum time a request waits for others to join.
+            name: Label used in log messages.
+        """
+        self._handler = handler
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._name = name
+
+        # asyncio futures and timers are loop-bound
+        self._pending: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its batch to complete.
+
+        Args:
+            item: Item passed to the handler as part of a batch.
+
+        Returns:
+            The handler's result for this item.
+        """
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(loop)
+        if pending is None:
+            pending = _PendingBatch()
+            self._pending[loop] = pending
+
+        future = loop.create_future()
+        pending.items.append((item, future))
+
+        if len(pending.items) >= self._max_batch_size:
+            self._flush(pending)
+        elif pending.flush_handle is None:
+            pending.flush_handle = loop.call_later(self._max_wait, self._flush, pending)
+
+        return await future
+
+    def _flush(self, pending: _PendingBatch):
+        """Dispatch all requests pending on the running loop as one batch."""
+        if pending.flush_handle is not None:
+            pending.flush_handle.cancel()
+            pending.flush_handle = None
+
+        batch, pending.items = pending.items, []
+        if batch:
+            # Keep a reference so the task is not collected mid-flight
+            task = asyncio.get_running_loop().create_task(self._execute(batch))
+            pending.tasks.add(task)
+            task.add_done_callback(pending.tasks.discard)
+
+    async def _execute(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Run one batch in a worker thread and resolve its futures."""
+        items = [item for item, _ in batch]
+
+        try:
+            results = await asyncio.to_thread(self._handler, items)
+        except Exception as e:
+            logger.exception("%s batch failed: %s", self._name, e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug("Executed %s batch of %d requests", self._name, len(batch))
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -13,6 +13,7 @@ import hashlib
 import numpy as np
 
 from ..config import get_config, EmbeddingConfig
+from .batching import MicroBatcher
 from ..mcp.protocol import MCPError, MCPErrorCode
 
 logger = logging.getLogger(__name__)
@@ -68,6 +69,12 @@ class EmbeddingService:
         self._model = None
         self._cache = EmbeddingCache()
         self._loaded = False
+        self._batcher = MicroBatcher(
+            self.embed_batch,
+            max_batch_size=self._config.batch_size,
+            max_wait_ms=self._config.batch_wait_ms,
+            name="Embedding"
+        )
     
     def _load_model(self):
         """Lazy load the embedding model."""
@@ -149,6 +156,24 @@ class EmbeddingService:
                 message=f"Embedding generation failed: {e}"
             )
     
+    async def aembed(self, text: str) -> List[float]:
+        """
+        Generate embedding for a single text from async code.
+
+        Cache hits return immediately; misses are batched with other
+        concurrent requests into a single model call.
+
+        Args:
+            text: Text to embed.
+
+        Returns:
+            Embedding vector as list of floats.
+        """
+        cached = self._cache.get(text, self._config.model_name)
+        if cached is not None:
+            return cached
+        return await self._batcher.submit(text)
+    
     def embed_batch(
         self,
         texts: List[str],
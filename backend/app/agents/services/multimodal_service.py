@@ -310,7 +310,7 @@ class MultimodalService:
             }
         
         # Generate embedding for transcribed text
-        query_embedding = await self.embedding.embed(transcription.text)
+        query_embedding = await self.embedding.aembed(transcription.text)
         
         # Build filters
         filters = {}
@@ -372,7 +372,7 @@ class MultimodalService:
         
         # Text search
         if text_query:
-            query_embedding = await self.embedding.embed(text_query)
+            query_embedding = await self.embedding.aembed(text_query)
             
             filters = {}
             if max_price:
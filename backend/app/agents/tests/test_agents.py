@@ -88,6 +88,38 @@ class TestAgentConfig:
         assert "llm" in config_dict
         assert "qdrant" in config_dict
         assert config_dict["llm"]["api_key"] in ["***", "NOT SET"]
+    
+    def test_config_is_frozen(self):
+        """Test configs are immutable, hashable and updated via replace()."""
+        import dataclasses
+        
+        config = AgentConfig()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.debug = True
+        
+        updated = dataclasses.replace(config, llm=LLMConfig(temperature=0))
+        assert updated.llm.temperature == 0
+        assert config.llm.temperature == 0.1
+        assert hash(updated) != hash(config)
+    
+    def test_configs_share_default_sections(self):
+        """Test nested default configs are shared, not rebuilt per instance."""
+        first, second = AgentConfig(), AgentConfig()
+        assert first.llm is second.llm
+        assert first.alternative is second.alternative
+        assert AgentConfig(llm=LLMConfig(temperature=0)).qdrant is first.qdrant
+    
+    def test_validate_and_to_dict_follow_replace(self):
+        """Test memoized validate()/to_dict() are recomputed for replaced configs."""
+        import dataclasses
+        
+        config = AgentConfig(llm=LLMConfig(api_key=""))
+        assert "GROQ_API_KEY is not set" in config.validate()
+        assert config.to_dict() is config.to_dict()
+        
+        updated = dataclasses.replace(config, llm=LLMConfig(api_key="key"))
+        assert "GROQ_API_KEY is not set" not in updated.validate()
+        assert updated.to_dict()["llm"]["api_key"] == "***"
 
 
 # ========================================
@@ -167,6 +199,20 @@ class TestContextManager:
         assert retrieved is not None
         assert retrieved.conversation_id == context.conversation_id
     
+    def test_update_context_only_sets_fields(self):
+        """Test updates apply to dataclass fields and skip anything else."""
+        manager = ContextManager()
+        context = manager.create_context()
+        
+        manager.update_context(context.conversation_id, {
+            "current_agent": "SearchAgent",
+            "add_message": None,
+            "unknown": 1
+        })
+        
+        assert context.current_agent == "SearchAgent"
+        assert callable(context.add_message)
+    
     def test_add_message(self):
         """Test adding messages to context."""
         manager = ContextManager()
@@ -178,7 +224,29 @@ class TestContextManager:
         assert len(context.messages) == 2
         assert context.messages[0]["role"] == "user"
         assert context.messages[1]["role"] == "assistant"
-    
+
+    def test_message_history_bounded(self):
+        """Test that old messages are evicted and recent ones returned in order."""
+        context = ConversationContext()
+
+        for i in range(250):
+            context.add_message("user", f"msg {i}")
+
+        assert len(context.messages) == 200
+        assert context.messages[0]["content"] == "msg 50"
+        recent = context.get_recent_messages(3)
+        assert [m["content"] for m in recent] == ["msg 247", "msg 248", "msg 249"]
+
+    def test_stage_wire_names(self):
+        """Test that stages serialize to and parse from their string names."""
+        from ..base.agent_state import ConversationStage
+
+        context = ConversationContext(stage=ConversationStage.COMPARE)
+        assert context.to_dict()["stage"] == "compare"
+        assert ConversationStage.from_name("decide") is ConversationStage.DECIDE
+        with pytest.raises(ValueError):
+            ConversationStage.from_name("checkout")
+
     def test_delete_context(self):
         """Test deleting context."""
         manager = ContextManager()
@@ -191,6 +259,63 @@ class TestContextManager:
         retrieved = manager.get_context(conv_id)
         assert retrieved is None
     
+    def test_recommended_products_deduplicated_in_order(self):
+        """Test product tracking keeps first-seen order without duplicates."""
+        manager = ContextManager()
+        context = manager.create_context()
+        conv_id = context.conversation_id
+
+        manager.add_recommended_products(conv_id, ["p3", "p1", "p3"])
+        manager.add_recommended_products(conv_id, ["p2", "p1"])
+        manager.mark_product_rejected(conv_id, "p1")
+        manager.mark_product_rejected(conv_id, "p1")
+
+        assert list(context.products.recommended_products) == ["p3", "p1", "p2"]
+        assert context.to_dict()["products"]["recommended"] == ["p3", "p1", "p2"]
+        assert manager.get_context_for_agent(conv_id, "alternative")["rejected_products"] == ["p1"]
+
+    def test_context_for_agent_reuses_compression(self):
+        """Test sibling agents share one compression until the context changes."""
+        manager = ContextManager()
+        conv_id = manager.create_context(user_id="user123").conversation_id
+
+        with patch.object(manager, "compress_context", wraps=manager.compress_context) as compress:
+            search = manager.get_context_for_agent(conv_id, "search")
+            alternative = manager.get_context_for_agent(conv_id, "alternative")
+            assert compress.call_count == 1
+            assert "recent_searches" not in alternative
+            assert "rejected_products" not in search
+
+            manager.add_recommended_products(conv_id, ["p1"])
+            updated = manager.get_context_for_agent(conv_id, "search")
+            assert compress.call_count == 2
+            assert updated["recommended_products"] == ["p1"]
+
+    def test_serialize_context_round_trip(self):
+        """Test serialized context is JSON and restores the conversation ID."""
+        import json
+
+        manager = ContextManager()
+        context = manager.create_context(user_id="user123")
+        context.add_message("user", "Find laptops")
+
+        data = manager.serialize_context(context)
+        assert isinstance(data, str)
+        assert json.loads(data)["user"]["user_id"] == "user123"
+        assert manager.deserialize_context(data).conversation_id == context.conversation_id
+
+    def test_evicts_least_recently_used(self):
+        """Test that going over max_history evicts the least recently used context."""
+        manager = ContextManager(max_history=3)
+        first, second, third = (manager.create_context() for _ in range(3))
+
+        manager.get_context(first.conversation_id)
+        manager.create_context()
+
+        assert manager.get_context(second.conversation_id) is None
+        assert manager.get_context(first.conversation_id) is first
+        assert manager.get_context(third.conversation_id) is third
+
     def test_global_context_manager(self):
         """Test global context manager singleton."""
         manager1 = get_context_manager()
@@ -358,7 +483,20 @@ class TestFinancialContext:
         assert financial.budget_min == 100
         assert financial.budget_max == 1000
         assert financial.risk_tolerance == "medium"
-    
+
+    def test_effective_budget_tracks_updates(self):
+        """Test effective budget fallback order follows field updates."""
+        financial = FinancialContext(monthly_budget=800, disposable_income=300)
+        assert financial.get_effective_budget() == 800
+
+        financial.budget_max = 500
+        assert financial.get_effective_budget() == 500
+        assert not financial.can_afford(600)
+
+        financial.budget_max = None
+        financial.monthly_budget = None
+        assert financial.get_effective_budget() == 300
+
     def test_user_context_with_financial(self):
         """Test user context with financial data."""
         financial = FinancialContext(
@@ -5,14 +5,15 @@ Provides tools for finding substitute products when
 budget or other constraints aren't met.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Type
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple, Type
 from pydantic import BaseModel, Field
 
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 from langchain_groq import ChatGroq
-from qdrant_client.models import Filter, FieldCondition, MatchValue, Range
+from qdrant_client.models import Filter, FieldCondition, MatchAny, MatchValue, Range, QueryRequest
 
 from .qdrant_tools import get_qdrant_client, embed_text
 from ..config import get_config
@@ -102,133 +103,264 @@ Can exclude specific products from results."""
         max_price: Optional[float] = None,
         same_category: bool = True,
         limit: int = 5,
-        exclude_ids: List[str] = None,
+        exclude_ids: Optional[Iterable[str]] = None,
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> Dict[str, Any]:
         """Find similar products."""
+        return self.run_batch(
+            product_id=product_id,
+            queries=[{
+                "max_price": max_price,
+                "same_category": same_category,
+                "limit": limit,
+                "exclude_ids": exclude_ids
+            }]
+        )[0]
+    
+    def run_batch(
+        self,
+        product_id: str,
+        queries: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Find similar products for several constraint sets in one round-trip.
+        
+        The source product is looked up once and all queries are sent to
+        Qdrant with a single ``query_batch_points`` call.
+        
+        Args:
+            product_id: Source product ID.
+            queries: List of dicts with optional ``max_price``,
+                ``same_category``, ``limit`` and ``exclude_ids`` keys.
+                ``exclude_ids`` may be any iterable of product IDs.
+            
+        Returns:
+            One result dict per query, in the same order.
+        """
+        return self.run_multi([(product_id, queries)])[0]
+    
+    def run_multi(
+        self,
+        items: List[Tuple[str, List[Dict[str, Any]]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run run_batch() for several source products at once.
+        
+        All source products are fetched with one scroll and every query of
+        every product goes out in one ``query_batch_points`` call.
+        
+        Args:
+            items: List of ``(product_id, queries)`` pairs.
+            
+        Returns:
+            One list of result dicts per item, in the same order.
+        """
         try:
             client = get_qdrant_client()
             config = get_config().qdrant
-            exclude_ids = exclude_ids or []
-            
-            # Get source product
-            source_results = client.scroll(
-                collection_name=config.products_collection,
-                scroll_filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="original_id",
-                            match=MatchValue(value=product_id)
-                        )
-                    ]
-                ),
-                limit=1,
-                with_vectors=True
-            )
-            
-            if not source_results[0]:
-                return {
-                    "success": False,
-                    "error": f"Source product {product_id} not found",
-                    "alternatives": []
-                }
-            
-            source_point = source_results[0][0]
-            source_product = source_point.payload
-            source_vector = source_point.vector
-            original_price = source_product.get('price', 0)
-            
-            # Build filter
-            filter_conditions = []
-            
-            if same_category:
-                filter_conditions.append(
-                    FieldCondition(
-                        key="category",
-                        match=MatchValue(value=source_product.get('category'))
-                    )
+            # Get source products. Several points can share an original_id
+            # and crowd others out of one page, so keep scrolling for the
+            # ids still unresolved; each round resolves at least one.
+            sources = {}
+            unresolved = list({product_id for product_id, _ in items})
+            while unresolved:
+                points, _ = client.scroll(
+                    collection_name=config.products_collection,
+                    scroll_filter=Filter(
+                        must=[
+                            FieldCondition(
+                                key="original_id",
+                                match=MatchAny(any=unresolved)
+                            )
+                        ]
+                    ),
+                    limit=len(unresolved),
+                    with_vectors=True
                 )
-            
-            if max_price:
-                filter_conditions.append(
-                    FieldCondition(
-                        key="price",
-                        range=Range(lte=max_price)
-                    )
-                )
-            
-            search_filter = Filter(must=filter_conditions) if filter_conditions else None
-            
-            # Search for similar products using query_points with named vector
-            # Extract 'text' vector if source has named vectors
-            if isinstance(source_vector, dict) and 'text' in source_vector:
-                query_vector = source_vector['text']
-            else:
-                query_vector = source_vector
-            
-            results = client.query_points(
-                collection_name=config.products_collection,
-                query=query_vector,
-                query_filter=search_filter,
-                limit=limit + len(exclude_ids) + 1,  # Extra to account for exclusions
-                with_payload=True,
-                using="text"  # Use the "text" named vector
-            )
-            
-            # Filter and format results
-            alternatives = []
-            exclude_set = set(exclude_ids + [product_id])
-            
-            for result in results.points:
-                result_id = result.payload.get('original_id', str(result.id))
-                if result_id in exclude_set:
+                if not points:
+                    break
+                for point in points:
+                    sources.setdefault(point.payload.get('original_id'), point)
+                unresolved = [pid for pid in unresolved if pid not in sources]
+            
+            requests = []
+            for product_id, queries in items:
+                source_point = sources.get(product_id)
+                if source_point is None:
                     continue
                 
-                price = result.payload.get('price', 0)
-                savings = original_price - price if original_price > 0 else 0
+                # Search for similar products using query_points with named vector
+                # Extract 'text' vector if source has named vectors
+                source_vector = source_point.vector
+                if isinstance(source_vector, dict) and 'text' in source_vector:
+                    query_vector = source_vector['text']
+                else:
+                    query_vector = source_vector
                 
-                alternatives.append({
-                    "id": str(result.id),
-                    "product_id": result_id,
-                    "similarity_score": round(result.score, 4),
-                    "title": result.payload.get('title'),
-                    "category": result.payload.get('category'),
-                    "price": price,
-                    "rating": result.payload.get('rating'),
-                    "savings": round(savings, 2) if savings > 0 else 0,
-                    "savings_percent": round(savings / original_price * 100, 1) if original_price > 0 and savings > 0 else 0
-                })
+                for query in queries:
+                    requests.append(QueryRequest(
+                        query=query_vector,
+                        filter=self._build_filter(
+                            source_point.payload,
+                            query.get("max_price"),
+                            query.get("same_category", True),
+                            self._exclude_set(product_id, query)
+                        ),
+                        limit=query.get("limit", 5),
+                        with_payload=True,
+                        using="text"  # Use the "text" named vector
+                    ))
+            
+            batch_results = iter(client.query_batch_points(
+                collection_name=config.products_collection,
+                requests=requests
+            ) if requests else [])
+            
+            results = []
+            for product_id, queries in items:
+                source_point = sources.get(product_id)
+                if source_point is None:
+                    results.append([
+                        {
+                            "success": False,
+                            "error": f"Source product {product_id} not found",
+                            "alternatives": []
+                        }
+                        for _ in queries
+                    ])
+                    continue
                 
-                if len(alternatives) >= limit:
-                    break
+                results.append([
+                    self._format_result(
+                        product_id, source_point.payload, query, next(batch_results).points
+                    )
+                    for query in queries
+                ])
             
-            return {
-                "success": True,
-                "source_product": {
-                    "id": product_id,
-                    "title": source_product.get('title'),
-                    "price": original_price,
-                    "category": source_product.get('category')
-                },
-                "constraints": {
-                    "max_price": max_price,
-                    "same_category": same_category
-                },
-                "count": len(alternatives),
-                "alternatives": alternatives
-            }
+            return results
             
         except Exception as e:
             logger.exception(f"Find similar products error: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "alternatives": []
-            }
+            return [
+                [
+                    {
+                        "success": False,
+                        "error": str(e),
+                        "alternatives": []
+                    }
+                    for _ in queries
+                ]
+                for _, queries in items
+            ]
+    
+    async def arun_batch(
+        self,
+        product_id: str,
+        queries: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Async version of run_batch()."""
+        return await asyncio.to_thread(self.run_batch, product_id, queries)
+    
+    def _build_filter(
+        self,
+        source_product: Dict[str, Any],
+        max_price: Optional[float],
+        same_category: bool,
+        exclude_ids: Set[str]
+    ) -> Filter:
+        """Build the Qdrant filter for one similarity query."""
+        filter_conditions = []
+        
+        if same_category:
+            filter_conditions.append(
+                FieldCondition(
+                    key="category",
+                    match=MatchValue(value=source_product.get('category'))
+                )
+            )
+        
+        if max_price:
+            filter_conditions.append(
+                FieldCondition(
+                    key="price",
+                    range=Range(lte=max_price)
+                )
+            )
+        
+        # Excluded products are dropped server-side in a single condition
+        return Filter(
+            must=filter_conditions or None,
+            must_not=[
+                FieldCondition(
+                    key="original_id",
+                    match=MatchAny(any=list(exclude_ids))
+                )
+            ]
+        )
+    
+    @staticmethod
+    def _exclude_set(product_id: str, query: Dict[str, Any]) -> Set[str]:
+        """Product IDs a query must not return, including the source itself."""
+        exclude = set(query.get("exclude_ids") or ())
+        exclude.add(product_id)
+        return exclude
+    
+    def _format_result(
+        self,
+        product_id: str,
+        source_product: Dict[str, Any],
+        query: Dict[str, Any],
+        points: List[Any]
+    ) -> Dict[str, Any]:
+        """Filter and format the points returned for one similarity query."""
+        original_price = source_product.get('price', 0)
+        limit = query.get("limit", 5)
+        
+        alternatives = []
+        exclude_set = self._exclude_set(product_id, query)
+        
+        for result in points:
+            result_id = result.payload.get('original_id', str(result.id))
+            if result_id in exclude_set:
+                continue
+            
+            price = result.payload.get('price', 0)
+            savings = original_price - price if original_price > 0 else 0
+            
+            alternatives.append({
+                "id": str(result.id),
+                "product_id": result_id,
+                "similarity_score": round(result.score, 4),
+                "title": result.payload.get('title'),
+                "category": result.payload.get('category'),
+                "price": price,
+                "rating": result.payload.get('rating'),
+                "savings": round(savings, 2) if savings > 0 else 0,
+                "savings_percent": round(savings / original_price * 100, 1) if original_price > 0 and savings > 0 else 0
+            })
+            
+            if len(alternatives) >= limit:
+                break
+        
+        return {
+            "success": True,
+            "source_product": {
+                "id": product_id,
+                "title": source_product.get('title'),
+                "price": original_price,
+                "category": source_product.get('category')
+            },
+            "constraints": {
+                "max_price": query.get("max_price"),
+                "same_category": query.get("same_category", True)
+            },
+            "count": len(alternatives),
+            "alternatives": alternatives
+        }
     
     async def _arun(self, *args, **kwargs) -> Dict[str, Any]:
-        """Async version."""
-        return self._run(*args, **kwargs)
+        """Async version - runs the blocking client call in a worker thread."""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
 
 
 # ========================================
@@ -335,8 +467,8 @@ Use when a product exceeds budget to determine:
             }
     
     async def _arun(self, *args, **kwargs) -> Dict[str, Any]:
-        """Async version."""
-        return self._run(*args, **kwargs)
+        """Async version - runs the blocking client call in a worker thread."""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
 
 
 # ========================================
@@ -514,5 +646,5 @@ Write a brief, helpful 2-3 sentence explanation introducing these alternatives a
             }
     
     async def _arun(self, *args, **kwargs) -> Dict[str, Any]:
-        """Async version."""
-        return self._run(*args, **kwargs)
+        """Async version - runs the blocking client call in a worker thread."""
+        return await asyncio.to_thread(self._run, *args, **kwargs)
@@ -7,7 +7,9 @@ including semantic search, recommendations, and similarity queries.
 
 import os
 import logging
-from typing import Dict, Any, List, Optional, Type
+import threading
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, Type
 from pydantic import BaseModel, Field
 
 from langchain_core.tools import BaseTool
@@ -43,28 +45,38 @@ def get_qdrant_client() -> QdrantClient:
     return _qdrant_client
 
 
-# Embedding model singleton
+# Embedding model singleton; the lock keeps a prefetch and a tool call
+# from loading it twice
 _embedding_model = None
+_embedding_model_lock = threading.Lock()
 
 
 def get_embedding_model():
     """Get or create the embedding model."""
     global _embedding_model
     if _embedding_model is None:
-        try:
-            from sentence_transformers import SentenceTransformer
-            config = get_config().embedding
-            _embedding_model = SentenceTransformer(config.model_name)
-        except ImportError:
-            logger.error("sentence-transformers not installed")
-            raise
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    config = get_config().embedding
+                    _embedding_model = SentenceTransformer(config.model_name)
+                except ImportError:
+                    logger.error("sentence-transformers not installed")
+                    raise
     return _embedding_model
 
 
 def embed_text(text: str) -> List[float]:
-    """Generate embedding for text."""
+    """Generate embedding for text (memoized per process)."""
+    return list(_embed_text_cached(text))
+
+
+@lru_cache(maxsize=1024)
+def _embed_text_cached(text: str) -> Tuple[float, ...]:
+    """Encode text once; repeated product texts and queries skip inference."""
     model = get_embedding_model()
-    return model.encode(text).tolist()
+    return tuple(model.encode(text).tolist())
 
 
 # ========================================
@@ -250,7 +250,223 @@ class TestAlternativeAgent:
             )
             
             assert mock_run.called
-    
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("budget,overage,expect_llm", [
+        (100.0, 900.0, False),  # needs a 90% cut
+        (500.0, 500.0, True),   # needs a 50% cut
+    ])
+    async def test_find_alternatives_feasibility_short_circuit(
+        self, alternative_agent, budget, overage, expect_llm
+    ):
+        """Test hopeless budgets return without invoking the LLM agent."""
+        from app.agents.base import ConversationContext
+
+        context = ConversationContext()
+        context.user.financial.budget_max = budget
+        alternative_agent._price_tool._arun = AsyncMock(return_value={
+            "success": True,
+            "adjustment_needed": True,
+            "overage": overage,
+            "overage_percent": overage / budget * 100
+        })
+
+        with patch.object(alternative_agent, 'run', new_callable=AsyncMock) as mock_run:
+            state = await alternative_agent.find_alternatives(
+                product={"title": "Laptop", "price": 1000.0},
+                context=context
+            )
+
+        assert mock_run.called == expect_llm
+        if not expect_llm:
+            assert state.output_text == "No viable alternatives within the given budget"
+            assert state.agent_chain == ["AlternativeAgent"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("constraint_type,expected", [
+        ("budget", "- Laptop: $1200"),
+        ("rating", "minimum: 4.5"),
+        ("availability", "Constraint 'availability'"),
+    ])
+    async def test_handle_constraint_failure_prompts(
+        self, alternative_agent, constraint_type, expected
+    ):
+        """Test each constraint type renders its own agent input."""
+        value = 4.5 if constraint_type == "rating" else 500
+        with patch.object(alternative_agent, 'run', new_callable=AsyncMock) as mock_run:
+            await alternative_agent.handle_constraint_failure(
+                constraint_type=constraint_type,
+                constraint_value=value,
+                original_results=[{"title": "Laptop", "price": 1200}]
+            )
+
+        assert expected in mock_run.call_args.args[0]
+
+    def test_budget_alternatives_single_batch(self, alternative_agent):
+        """Test same-category and broader searches share one batched call."""
+        alternative_agent._price_tool._arun = AsyncMock(return_value={"overage": 20})
+        alternative_agent._similar_tool.run_multi.return_value = [[
+            {"alternatives": [{"product_id": "a"}]},
+            {"alternatives": [{"product_id": "a"}, {"product_id": "b"}, {"product_id": "c"}]}
+        ]]
+
+        result = alternative_agent.get_budget_alternatives(
+            product={"id": "orig", "price": 120.0},
+            user_budget=100.0,
+            num_alternatives=2
+        )
+
+        assert alternative_agent._similar_tool.run_multi.call_count == 1
+        assert [a["product_id"] for a in result["alternatives"]] == ["a", "b"]
+
+    def test_budget_alternatives_inside_running_loop(self, alternative_agent):
+        """Test the sync entry point also works when called from async code."""
+        import asyncio
+
+        alternative_agent._price_tool._arun = AsyncMock(return_value={"overage": 20})
+        alternative_agent._similar_tool.run_multi.return_value = [[
+            {"alternatives": [{"product_id": "a"}]},
+            {"alternatives": []}
+        ]]
+
+        async def call_from_loop():
+            return alternative_agent.get_budget_alternatives({"id": "orig", "price": 120.0}, 100.0, 1)
+
+        result = asyncio.run(call_from_loop())
+
+        assert [a["product_id"] for a in result["alternatives"]] == ["a"]
+
+    def test_budget_alternatives_cached(self, alternative_agent):
+        """Test repeated budget lookups are served from the cache."""
+        from app.agents.services import CacheService
+
+        alternative_agent._price_tool._arun = AsyncMock(return_value={"overage": 20})
+        alternative_agent._similar_tool.run_multi.return_value = [[
+            {"success": True, "alternatives": [{"product_id": "a"}]},
+            {"success": True, "alternatives": []}
+        ]]
+
+        with patch('app.agents.services.get_cache_service', return_value=CacheService()):
+            first = alternative_agent.get_budget_alternatives({"id": "orig", "price": 120.0}, 100.0, 1)
+            # Equal money values key to the same entry
+            second = alternative_agent.get_budget_alternatives({"id": "orig", "price": 120}, 100.000001, 1)
+
+        assert alternative_agent._similar_tool.run_multi.call_count == 1
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_batcher_coalesces_concurrent_requests(self):
+        """Test concurrent lookups are sent to the tool as one batch."""
+        import asyncio
+        from app.agents.alternative_agent.batcher import AltRequestBatcher
+
+        tool = MagicMock()
+        tool.run_multi.side_effect = lambda items: [[{"product_id": pid}] for pid, _ in items]
+        batcher = AltRequestBatcher(tool, max_batch_size=8, max_wait_ms=5)
+
+        first, second = await asyncio.gather(
+            batcher.submit("p1", [{"limit": 1}]),
+            batcher.submit("p2", [{"limit": 1}])
+        )
+
+        assert tool.run_multi.call_count == 1
+        assert first == [{"product_id": "p1"}]
+        assert second == [{"product_id": "p2"}]
+
+    def test_batcher_keeps_batches_per_event_loop(self):
+        """Test sync callers on separate threads and loops never share a batch."""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        from app.agents.alternative_agent.batcher import AltRequestBatcher
+
+        tool = MagicMock()
+        tool.run_multi.side_effect = lambda items: [[{"product_id": pid}] for pid, _ in items]
+        batcher = AltRequestBatcher(tool, max_batch_size=8, max_wait_ms=20)
+
+        def lookup(pid):
+            return asyncio.run(batcher.submit(pid, [{"limit": 1}]))
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(lookup, f"p{i}") for i in range(4)]
+            results = [f.result(timeout=5) for f in futures]
+
+        assert results == [[{"product_id": f"p{i}"}] for i in range(4)]
+
+    def test_default_tools_shared_with_direct_calls(self, alternative_agent):
+        """Test the executor tools are the same instances used by direct calls."""
+        tools = alternative_agent.get_tools()
+        assert tools == [
+            alternative_agent._similar_tool,
+            alternative_agent._price_tool,
+            alternative_agent._suggest_tool
+        ]
+
+    def test_system_prompt_is_static_prefix(self, alternative_agent):
+        """Test the system prompt leads the prompt and can carry a cache marker."""
+        messages = alternative_agent.prompt_template.format_messages(
+            input="cheaper laptop", agent_scratchpad=[]
+        )
+        assert messages[0].content == alternative_agent._get_system_prompt()
+        assert alternative_agent.prompt_template is alternative_agent.prompt_template
+
+        from app.agents.alternative_agent import AlternativeAgent
+        assert AlternativeAgent().prompt_template is alternative_agent.prompt_template
+
+        from dataclasses import replace
+        config = alternative_agent.config
+        alternative_agent.config = replace(
+            config, llm=replace(config.llm, prompt_cache_control=True)
+        )
+        try:
+            system = alternative_agent.prompt_template.format_messages(
+                input="cheaper laptop", agent_scratchpad=[]
+            )[0]
+        finally:
+            alternative_agent.config = config
+
+        assert system.content[0]["cache_control"] == {"type": "ephemeral"}
+
+    def test_similar_search_excludes_ids_server_side(self):
+        """Test excluded IDs become one must_not condition on the Qdrant filter."""
+        from app.agents.tools import FindSimilarProductsTool
+
+        tool = FindSimilarProductsTool()
+        query = {"exclude_ids": {"p2", "p3"}}
+        search_filter = tool._build_filter(
+            {"category": "Electronics"}, 100.0, True, tool._exclude_set("p1", query)
+        )
+
+        assert len(search_filter.must) == 2
+        assert len(search_filter.must_not) == 1
+        assert set(search_filter.must_not[0].match.any) == {"p1", "p2", "p3"}
+
+    def test_similar_search_scrolls_until_all_sources_found(self):
+        """Test duplicate source points cannot crowd another source out of the scroll page."""
+        from app.agents.tools import FindSimilarProductsTool
+
+        def make_point(original_id):
+            point = MagicMock()
+            point.payload = {"original_id": original_id, "category": "Electronics", "price": 50.0}
+            point.vector = {"text": [0.1, 0.2]}
+            return point
+
+        client = MagicMock()
+        client.scroll.side_effect = [
+            ([make_point("a"), make_point("a")], None),
+            ([make_point("b")], None),
+        ]
+        client.query_batch_points.side_effect = lambda **kwargs: [
+            MagicMock(points=[]) for _ in kwargs["requests"]
+        ]
+
+        tool = FindSimilarProductsTool()
+        with patch('app.agents.tools.alternative_tools.get_qdrant_client', return_value=client):
+            results = tool.run_multi([("a", [{}]), ("b", [{}])])
+
+        assert client.scroll.call_count == 2
+        assert client.scroll.call_args.kwargs["scroll_filter"].must[0].match.any == ["b"]
+        assert all("error" not in r[0] for r in results)
+
     def test_agent_initialization(self):
         """Test AlternativeAgent initializes correctly."""
         with patch('app.agents.alternative_agent.agent.FindSimilarProductsTool'):
@@ -317,6 +533,180 @@ class TestExplainabilityAgent:
                     agent = ExplainabilityAgent()
                     
                     assert agent.agent_name == "ExplainabilityAgent"
+    
+    def test_get_explanation_is_cached(self, sample_products):
+        """Test repeated direct explanations reuse the cached result."""
+        from app.agents.explainability_agent import ExplainabilityAgent
+        from app.agents.services.cache_service import CacheService
+        
+        agent = ExplainabilityAgent()
+        agent._explanation_tool = MagicMock()
+        agent._explanation_tool._run.return_value = {"success": True, "explanation": "Fits"}
+        
+        with patch('app.agents.services.get_cache_service', return_value=CacheService()):
+            first = agent.get_explanation(sample_products[0], explanation_type="brief")
+            second = agent.get_explanation(sample_products[0], explanation_type="brief")
+            agent.get_explanation(sample_products[0], explanation_type="detailed")
+        
+        assert first == second
+        assert first["explanation"] == "Fits"
+        assert agent._explanation_tool._run.call_count == 2
+    
+    def test_get_explanation_skips_disabled_components(self, sample_products):
+        """Test components turned off in config never call their tools."""
+        from app.agents.config import AgentConfig, ExplainabilityAgentConfig
+        from app.agents.explainability_agent import ExplainabilityAgent
+        from app.agents.services.cache_service import CacheService
+        
+        config = AgentConfig(explainability=ExplainabilityAgentConfig(
+            include_similarity_score=False,
+            include_financial_analysis=False
+        ))
+        agent = ExplainabilityAgent(config=config)
+        agent._similarity_tool = MagicMock()
+        agent._financial_tool = MagicMock()
+        agent._explanation_tool = MagicMock()
+        agent._explanation_tool._run.return_value = {"success": True, "explanation": "Fits"}
+        
+        with patch('app.agents.services.get_cache_service', return_value=CacheService()):
+            result = agent.get_explanation(
+                sample_products[0],
+                user_profile={"financial_context": {"budget_max": 500}},
+                query="headphones"
+            )
+        
+        assert result["components"] == {}
+        agent._similarity_tool._run.assert_not_called()
+        agent._financial_tool._run.assert_not_called()
+    
+    def test_get_explanation_brief_fast_path(self, sample_products):
+        """Test brief-only configs render brief explanations without the LLM tool."""
+        from app.agents.config import AgentConfig, ExplainabilityAgentConfig
+        from app.agents.explainability_agent import ExplainabilityAgent
+        from app.agents.services.cache_service import CacheService
+        
+        config = AgentConfig(explainability=ExplainabilityAgentConfig(
+            include_similarity_score=False,
+            explanation_detail="brief"
+        ))
+        agent = ExplainabilityAgent(config=config)
+        agent._financial_tool = MagicMock()
+        agent._financial_tool._run.return_value = {"success": True, "fit_level": "good"}
+        agent._explanation_tool = MagicMock()
+        
+        with patch('app.agents.services.get_cache_service', return_value=CacheService()):
+            result = agent.get_explanation(
+                sample_products[0],
+                user_profile={"financial_context": {"budget_max": 500}},
+                query="headphones",
+                explanation_type="brief"
+            )
+        
+        agent._explanation_tool._run.assert_not_called()
+        assert result["explanation"] == (
+            f"{sample_products[0]['title']} matches 'headphones' and fits your budget (good)."
+        )
+    
+    def test_get_explanation_cache_keyed_by_detail(self, sample_products):
+        """Test brief templates cached by one agent are not served to a detailed one."""
+        from app.agents.config import AgentConfig, ExplainabilityAgentConfig
+        from app.agents.explainability_agent import ExplainabilityAgent
+        from app.agents.services.cache_service import CacheService
+        
+        def make_agent(detail):
+            agent = ExplainabilityAgent(config=AgentConfig(
+                explainability=ExplainabilityAgentConfig(
+                    include_similarity_score=False,
+                    explanation_detail=detail
+                )
+            ))
+            agent._financial_tool = MagicMock()
+            agent._financial_tool._run.return_value = {"success": True, "fit_level": "good"}
+            agent._explanation_tool = MagicMock()
+            agent._explanation_tool._run.return_value = {"success": True, "explanation": "LLM text"}
+            return agent
+        
+        brief_agent, detailed_agent = make_agent("brief"), make_agent("detailed")
+        
+        with patch('app.agents.services.get_cache_service', return_value=CacheService()):
+            brief_agent.get_explanation(sample_products[0], explanation_type="brief")
+            result = detailed_agent.get_explanation(sample_products[0], explanation_type="brief")
+        
+        assert result["explanation"] == "LLM text"
+    
+    def test_compare_products_points(self):
+        """Test comparison picks cheapest, best rated and best value products."""
+        from app.agents.explainability_agent import ExplainabilityAgent
+        
+        agent = ExplainabilityAgent()
+        products = [
+            {"id": "a", "title": "A", "price": 100, "rating": 4.0},
+            {"id": "b", "title": "B", "price": 40, "rating": 3.0},
+            {"id": "c", "title": "C", "price": 0, "rating": 5.0},
+        ]
+        
+        points = {
+            p["factor"]: p for p in agent.compare_products(products)["comparison_points"]
+        }
+        
+        assert points["price"] == {"factor": "price", "best": "C", "note": "$0 vs $100"}
+        assert points["rating"]["best"] == "C"
+        assert points["rating"]["note"] == "5.0/5 stars"
+        assert points["value"]["best"] == "B"
+    
+    def test_compare_products_respects_include_flags(self):
+        """Test disabled analyses add no comparison points."""
+        from app.agents.config import AgentConfig, ExplainabilityAgentConfig
+        from app.agents.explainability_agent import ExplainabilityAgent
+        
+        config = AgentConfig(explainability=ExplainabilityAgentConfig(
+            include_financial_analysis=False
+        ))
+        agent = ExplainabilityAgent(config=config)
+        products = [
+            {"id": "a", "title": "A", "price": 100, "rating": 4.0},
+            {"id": "b", "title": "B", "price": 40, "rating": 3.0},
+        ]
+        
+        comparison = agent.compare_products(
+            products, user_profile={"financial_context": {"budget_max": 50}}
+        )
+        
+        assert [p["factor"] for p in comparison["comparison_points"]] == ["rating"]
+        assert "within_budget" not in comparison["products"][0]
+    
+    def test_explain_multiple_runs_concurrently(self, sample_products):
+        """Test products are explained in parallel and returned in order."""
+        import threading
+        from app.agents.explainability_agent import ExplainabilityAgent
+        
+        agent = ExplainabilityAgent()
+        # Only passes once all three explanations are running at the same time
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def slow_explanation(product, **kwargs):
+            barrier.wait()
+            return {"product_id": product["id"]}
+        
+        with patch.object(agent, 'get_explanation', side_effect=slow_explanation):
+            results = agent.explain_multiple(sample_products[:3])
+        
+        assert [r["product_id"] for r in results] == [p["id"] for p in sample_products[:3]]
+    
+    def test_explain_multiple_inside_running_loop(self, sample_products):
+        """Test the sync entry point also works when called from async code."""
+        import asyncio
+        from app.agents.explainability_agent import ExplainabilityAgent
+        
+        agent = ExplainabilityAgent()
+        
+        async def call_from_loop():
+            return agent.explain_multiple(sample_products[:2])
+        
+        with patch.object(agent, 'get_explanation', side_effect=lambda product, **kw: {"product_id": product["id"]}):
+            results = asyncio.run(call_from_loop())
+        
+        assert [r["product_id"] for r in results] == [p["id"] for p in sample_products[:2]]
 
 
 # ==============================================================================
@@ -411,3 +801,400 @@ class TestAgentErrorHandling:
                 result = await agent.search(None)
                 # Should handle gracefully
                 assert result is not None or mock_run.called
+
+
+# ==============================================================================
+# ParallelAgentExecutor Tests
+# ==============================================================================
+
+class TestParallelAgentExecutor:
+    """Test suite for concurrent tool execution within one agent step."""
+    
+    @pytest.fixture
+    def executor_and_tracker(self):
+        """Create an executor whose plan issues four calls to a slow tool."""
+        import threading
+        import time
+        from langchain_core.agents import AgentAction, AgentFinish
+        from langchain_core.runnables import RunnableLambda
+        from langchain_core.tools import tool
+        from app.agents.base.parallel_executor import ParallelAgentExecutor
+        
+        tracker = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+        
+        @tool
+        def slow_lookup(x: str) -> str:
+            """Look something up slowly."""
+            with lock:
+                tracker["active"] += 1
+                tracker["peak"] = max(tracker["peak"], tracker["active"])
+            time.sleep(0.05)
+            with lock:
+                tracker["active"] -= 1
+            return x
+        
+        def plan(inputs):
+            steps = inputs["intermediate_steps"]
+            if steps:
+                return AgentFinish({"output": ",".join(obs for _, obs in steps)}, "")
+            return [AgentAction("slow_lookup", {"x": str(i)}, "") for i in range(4)]
+        
+        executor = ParallelAgentExecutor(
+            agent=RunnableLambda(plan),
+            tools=[slow_lookup],
+            tool_concurrency_limit=2
+        )
+        return executor, tracker
+    
+    def test_sync_tool_calls_run_concurrently(self, executor_and_tracker):
+        """Test sync invocation overlaps tool calls up to the limit, in order."""
+        executor, tracker = executor_and_tracker
+        
+        result = executor.invoke({"input": "compare"})
+        
+        assert result["output"] == "0,1,2,3"
+        assert tracker["peak"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_async_tool_calls_respect_limit(self, executor_and_tracker):
+        """Test async invocation caps concurrent tool calls at the limit."""
+        executor, tracker = executor_and_tracker
+        
+        result = await executor.ainvoke({"input": "compare"})
+        
+        assert result["output"] == "0,1,2,3"
+        assert tracker["peak"] == 2
+
+
+# ==============================================================================
+# BaseAgent Run Tests
+# ==============================================================================
+
+class TestBaseAgentRun:
+    """Test suite for BaseAgent run paths and the response cache."""
+    
+    @pytest.fixture
+    def agent(self):
+        """Create an agent with a deterministic LLM config and a mock executor."""
+        from app.agents.alternative_agent import AlternativeAgent
+        from app.agents.config import AgentConfig, LLMConfig
+        from app.agents.services.cache_service import CacheService
+        
+        config = AgentConfig(llm=LLMConfig(temperature=0, cache_responses=True))
+        agent = AlternativeAgent(config=config)
+        agent._agent_executor = MagicMock()
+        agent._agent_executor.ainvoke = AsyncMock(
+            return_value={"output": "Try the Model B", "intermediate_steps": []}
+        )
+        
+        with patch('app.agents.services.get_cache_service', return_value=CacheService()):
+            yield agent
+    
+    @pytest.mark.asyncio
+    async def test_identical_requests_hit_cache(self, agent):
+        """Test a repeated request is answered without re-running the executor."""
+        first = await agent.run("cheaper laptop")
+        second = await agent.run("cheaper laptop")
+        
+        assert first.output_text == second.output_text == "Try the Model B"
+        assert agent._agent_executor.ainvoke.await_count == 1
+        assert {"cache_hit": True} not in [r["result"] for r in first.intermediate_results]
+        assert {"cache_hit": True} in [r["result"] for r in second.intermediate_results]
+    
+    @pytest.mark.asyncio
+    async def test_cache_not_shared_between_users(self, agent):
+        """Test the same request from different users runs the executor for each."""
+        from app.agents.base import AgentState
+        
+        for user_id in ("u1", "u2"):
+            state = AgentState(input_text="cheaper laptop")
+            state.context.user.user_id = user_id
+            await agent.run("cheaper laptop", state)
+        
+        assert agent._agent_executor.ainvoke.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_default_config_does_not_cache(self):
+        """Test the response cache is opt-in and off with the default config."""
+        from app.agents.alternative_agent import AlternativeAgent
+        from app.agents.services.cache_service import CacheService
+        
+        agent = AlternativeAgent()
+        agent._agent_executor = MagicMock()
+        agent._agent_executor.ainvoke = AsyncMock(return_value={"output": "Try the Model B"})
+        
+        with patch('app.agents.services.get_cache_service', return_value=CacheService()):
+            await agent.run("cheaper laptop")
+            await agent.run("cheaper laptop")
+        
+        assert agent._agent_executor.ainvoke.await_count == 2
+    
+    def test_run_sync_reuses_async_path(self, agent):
+        """Test run_sync drives run() and shares its cache across calls."""
+        first = agent.run_sync("cheaper laptop")
+        second = agent.run_sync("cheaper laptop")
+        
+        assert first.output_text == second.output_text == "Try the Model B"
+        assert agent._agent_executor.ainvoke.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_run_sync_inside_running_loop(self, agent):
+        """Test run_sync can be called from code already inside an event loop."""
+        state = agent.run_sync("cheaper laptop")
+        
+        assert state.output_text == "Try the Model B"
+    
+    def test_run_sync_on_sync_loop_thread_raises(self, agent):
+        """Test a sync call from the background loop's own thread fails fast."""
+        from app.agents.base.base_agent import _run_coroutine_sync
+        
+        async def nested():
+            agent.run_sync("cheaper laptop")
+        
+        with pytest.raises(RuntimeError, match="agent-sync-loop"):
+            _run_coroutine_sync(nested())
+    
+    @pytest.mark.asyncio
+    async def test_delegate_to_many_runs_concurrently_and_merges(self, agent):
+        """Test fan-out runs sibling agents in parallel and merges their branches."""
+        import asyncio
+        from app.agents.base import AgentState
+        
+        running = 0
+        both_running = asyncio.Event()
+        
+        def make_agent(name, product_id):
+            async def run(task, branch):
+                nonlocal running
+                running += 1
+                if running == 2:
+                    both_running.set()
+                # Times out unless the sibling is running at the same time
+                await asyncio.wait_for(both_running.wait(), timeout=5)
+                branch.agent_chain.append(name)
+                branch.output_products.append({"id": product_id})
+                branch.output_text = f"{name} done"
+                return branch
+            sibling = MagicMock()
+            sibling.agent_name = name
+            sibling.run = run
+            return sibling
+        
+        agent.register_agent(make_agent("SearchAgent", "p1"))
+        agent.register_agent(make_agent("RecommendationAgent", "p2"))
+        state = AgentState(input_text="laptop", agent_chain=["AlternativeAgent"])
+        
+        state = await agent.delegate_to_many(
+            [("SearchAgent", "find"), ("RecommendationAgent", "rank"), ("Unknown", "x")],
+            state
+        )
+        
+        assert state.agent_chain == ["AlternativeAgent", "SearchAgent", "RecommendationAgent"]
+        assert state.output_products == [{"id": "p1"}, {"id": "p2"}]
+        assert state.output_text == "SearchAgent done\n\nRecommendationAgent done"
+        assert state.errors == ["Agent 'Unknown' not registered"]
+        assert state.delegation_depth == 1
+    
+    def test_branch_state_forks_without_copying(self, agent):
+        """Test branches share context but start with empty result lists."""
+        from app.agents.base import AgentState, ConversationContext
+        
+        state = AgentState(
+            input_text="laptop",
+            context=ConversationContext(),
+            agent_chain=["AlternativeAgent"],
+            output_products=[{"id": "p0"}],
+            errors=["earlier"]
+        )
+        branch = agent._branch_state(state)
+        assert branch.context is state.context
+        assert branch.output_products == [] and branch.agent_chain == []
+        
+        branch.agent_chain.append("SearchAgent")
+        branch.output_products.append({"id": "p1"})
+        branch.errors.append("earlier")
+        agent._merge_results(state, [branch])
+        
+        assert state.agent_chain == ["AlternativeAgent", "SearchAgent"]
+        assert state.output_products == [{"id": "p0"}, {"id": "p1"}]
+        assert state.errors == ["earlier"]
+    
+    @pytest.mark.asyncio
+    async def test_different_input_or_temperature_misses(self, agent):
+        """Test cache keys depend on input and caching is off for sampled output."""
+        await agent.run("cheaper laptop")
+        await agent.run("cheaper phone")
+        assert agent._agent_executor.ainvoke.await_count == 2
+        
+        from dataclasses import replace
+        agent.config = replace(agent.config, llm=replace(agent.config.llm, temperature=0.7))
+        await agent.run("cheaper laptop")
+        assert agent._agent_executor.ainvoke.await_count == 3
+    
+    @pytest.fixture
+    def prefetching_agent(self, agent):
+        """Agent with speculative prefetch enabled and a query-embedding tool."""
+        from dataclasses import replace
+        from app.agents.tools.qdrant_tools import QdrantSearchTool
+        
+        agent.config = replace(agent.config, speculative_prefetch=True)
+        agent._tools = agent._tools + [QdrantSearchTool()]
+        return agent
+    
+    @pytest.mark.asyncio
+    async def test_prefetch_overlaps_llm_call(self, prefetching_agent):
+        """Test tool resources are warmed while the executor is running."""
+        import asyncio
+        import threading
+        
+        embed_started = threading.Event()
+        overlapped = []
+        
+        async def slow_invoke(executor_input):
+            # Still inside the LLM call when the prefetch starts embedding
+            overlapped.append(await asyncio.to_thread(embed_started.wait, 5))
+            return {"output": "Try the Model B"}
+        
+        def slow_embed(text):
+            embed_started.set()
+            return [0.0]
+        
+        prefetching_agent._agent_executor.ainvoke = slow_invoke
+        with patch('app.agents.tools.qdrant_tools.get_qdrant_client'), \
+             patch('app.agents.tools.qdrant_tools.embed_text', side_effect=slow_embed) as mock_embed:
+            state = await prefetching_agent.run("cheaper laptop")
+        
+        assert state.output_text == "Try the Model B"
+        mock_embed.assert_called_once_with("cheaper laptop")
+        assert overlapped == [True]
+    
+    @pytest.mark.asyncio
+    async def test_slow_prefetch_does_not_delay_answer(self, prefetching_agent):
+        """Test a finished LLM answer is returned without waiting for the prefetch."""
+        import asyncio
+        import threading
+        
+        embed_started = threading.Event()
+        release = threading.Event()
+        embed_finished = threading.Event()
+        
+        async def invoke(executor_input):
+            await asyncio.to_thread(embed_started.wait, 5)
+            return {"output": "Try the Model B"}
+        
+        def blocked_embed(text):
+            embed_started.set()
+            release.wait(5)
+            embed_finished.set()
+            return [0.0]
+        
+        prefetching_agent._agent_executor.ainvoke = invoke
+        with patch('app.agents.tools.qdrant_tools.get_qdrant_client'), \
+             patch('app.agents.tools.qdrant_tools.embed_text', side_effect=blocked_embed):
+            try:
+                state = await prefetching_agent.run("cheaper laptop")
+                # run() returned while the embed was still blocked
+                assert state.output_text == "Try the Model B"
+                assert embed_started.is_set() and not embed_finished.is_set()
+            finally:
+                release.set()
+    
+    @pytest.mark.asyncio
+    async def test_default_config_skips_prefetch(self, agent):
+        """Test prefetch is opt-in and never embeds with the default config."""
+        with patch('app.agents.tools.qdrant_tools.embed_text') as mock_embed:
+            await agent.run("cheaper laptop")
+        
+        mock_embed.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_prefetch_skipped_without_search_tool(self, agent):
+        """Test agents without a query-embedding tool do not prefetch."""
+        from dataclasses import replace
+        
+        agent.config = replace(agent.config, speculative_prefetch=True)
+        with patch('app.agents.tools.qdrant_tools.embed_text') as mock_embed:
+            await agent.run("cheaper laptop")
+        
+        mock_embed.assert_not_called()
+    
+    def test_chat_history_trimmed_to_token_budget(self, agent):
+        """Test history keeps the newest turns that fit the context window."""
+        from app.agents.base import AgentState, ConversationContext
+        
+        context = ConversationContext()
+        for i in range(12):
+            context.add_message("user" if i % 2 == 0 else "assistant", f"turn {i}")
+        state = AgentState(input_text="laptop", context=context)
+        
+        history = agent._prepare_executor_input("laptop", state)["chat_history"]
+        assert [m.content for m in history] == [f"turn {i}" for i in range(2, 12)]
+        assert history[-1].type == "ai"
+        
+        context.add_message("user", "x" * 40_000)
+        context.add_message("assistant", "short answer")
+        history = agent._prepare_executor_input("laptop", state)["chat_history"]
+        assert [m.content for m in history] == ["short answer"]
+    
+    def test_chat_history_budget_is_conservative(self, agent):
+        """Test non-ASCII text is not undercounted and the window keeps a margin."""
+        from app.agents.base import AgentState, ConversationContext
+        from app.agents.base.base_agent import _estimate_tokens
+        
+        assert _estimate_tokens("价格" * 100) > _estimate_tokens("ab" * 100)
+        
+        # Fits the raw window after output room, but not inside the margin
+        llm_config = agent.config.llm
+        free = llm_config.context_window - llm_config.max_tokens
+        context = ConversationContext()
+        context.add_message("user", "x" * (free * 4 - 400))
+        context.add_message("assistant", "short answer")
+        state = AgentState(input_text="laptop", context=context)
+        
+        history = agent._prepare_executor_input("laptop", state)["chat_history"]
+        assert [m.content for m in history] == ["short answer"]
+    
+    def test_tool_steps_recorded_only_in_debug(self, agent):
+        """Test tool steps are requested in debug mode and stored truncated."""
+        from dataclasses import replace
+        from langchain_core.agents import AgentAction
+        from app.agents.base import AgentState
+        
+        assert agent._create_agent_executor().return_intermediate_steps is False
+        agent.config = replace(agent.config, debug=True)
+        assert agent._create_agent_executor().return_intermediate_steps is True
+        
+        action = AgentAction(tool="find_similar_products", tool_input={"q": "x"}, log="")
+        result = {"output": "done", "intermediate_steps": [(action, "y" * 10_000)]}
+        state = agent._process_result(result, AgentState(input_text="laptop"))
+        
+        step = state.intermediate_results[0]["result"]
+        assert step["tool"] == "find_similar_products"
+        assert step["input"] == "{'q': 'x'}"
+        assert len(step["output"]) <= 500
+
+
+# ==============================================================================
+# BaseAgent LLM Pool Tests
+# ==============================================================================
+
+class TestBaseAgentLLMPool:
+    """Test suite for process-wide LLM client reuse."""
+    
+    def test_agents_with_same_settings_share_llm(self):
+        """Test agents share a client per model settings, not per instance."""
+        from app.agents.alternative_agent import AlternativeAgent
+        from app.agents.search_agent import SearchAgent
+        from app.agents.config import AgentConfig, LLMConfig
+        
+        config = AgentConfig(llm=LLMConfig(api_key="test-key"))
+        first = AlternativeAgent(config=config)
+        second = SearchAgent(config=config)
+        
+        assert first.llm is second.llm
+        assert first.fallback_llm is second.fallback_llm
+        assert first.llm is not first.fallback_llm
+        
+        other = AgentConfig(llm=LLMConfig(api_key="test-key", temperature=0.5))
+        assert AlternativeAgent(config=other).llm is not first.llm
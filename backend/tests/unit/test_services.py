@@ -7,6 +7,7 @@ Tests:
 - UserService
 """
 
+import asyncio
 import pytest
 from unittest.mock import Mock, MagicMock, AsyncMock, patch
 from typing import Dict, Any, List
@@ -216,6 +217,51 @@ class TestEmbeddingService:
             # Should be called (caching behavior depends on implementation)
             assert mock_embed.call_count >= 1
 
+    @pytest.mark.asyncio
+    async def test_aembed_batches_concurrent_requests(self):
+        """Test that concurrent aembed calls share one model call."""
+        import numpy as np
+        from app.agents.config import EmbeddingConfig
+        from app.agents.services.embedding_service import EmbeddingService
+        
+        service = EmbeddingService(EmbeddingConfig(batch_size=32, batch_wait_ms=5))
+        service._loaded = True
+        service._model = MagicMock()
+        service._model.encode.side_effect = lambda texts, **kwargs: np.array(
+            [[float(len(text))] for text in texts]
+        )
+        
+        texts = ["tv", "laptop", "headphones"]
+        results = await asyncio.gather(*(service.aembed(t) for t in texts))
+        
+        assert results == [[2.0], [6.0], [10.0]]
+        assert service._model.encode.call_count == 1
+        
+        # Cached texts skip the model entirely
+        assert await service.aembed("laptop") == [6.0]
+        assert service._model.encode.call_count == 1
+
+    def test_aembed_from_separate_event_loops(self):
+        """Test aembed callers on separate threads and loops all complete."""
+        import numpy as np
+        from concurrent.futures import ThreadPoolExecutor
+        from app.agents.config import EmbeddingConfig
+        from app.agents.services.embedding_service import EmbeddingService
+        
+        service = EmbeddingService(EmbeddingConfig(batch_size=32, batch_wait_ms=20))
+        service._loaded = True
+        service._model = MagicMock()
+        service._model.encode.side_effect = lambda texts, **kwargs: np.array(
+            [[float(len(text))] for text in texts]
+        )
+        
+        texts = ["tv", "laptop", "headphones", "camera"]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(lambda t: asyncio.run(service.aembed(t)), t) for t in texts]
+            results = [f.result(timeout=5) for f in futures]
+        
+        assert results == [[2.0], [6.0], [10.0], [6.0]]
+
 
 # ==============================================================================
 # UserService Tests